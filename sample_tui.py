@@ -99,6 +99,7 @@ class PBMStereo(TuiPlot):
         self.img += 1
         if self.img > 2:
             self.img = 0
+        self.clear()
 
     def draw_cube_shape(self, x, y, xcoords, ycoords):
         self.push_line_color(Style(color="white", bold=True))
@@ -169,7 +170,8 @@ class Slideshow:
                 self.parent.which_img = 0
             else:
                 self.parent.which_img += 1
-            await self.parent._parent.post_message(RenderableUpdate(self))
+            self.parent.clear()
+            await self.parent._parent.post_message(RenderableUpdate(self, self.parent))
 
 # ===================================================
 # A class to render the "Graphics" tab images
@@ -308,18 +310,14 @@ class TimePlot(TuiPlot):
     def render_canvas(self) -> None:
         """ Draws the a simple sine wave to the bare canvas """
 
-        self.push_line_color("bright_yellow")
-        lastx = 0
-        lasty = math.sin(0) + 0.5
+        xs = [0]
+        ys = [math.sin(0) + 0.5]
         for x in range(4, self.width*2, 4):
             xf = x / (self.width*2)
             waves = 3
-            y = math.sin(xf * waves * 2 * math.pi) / 2 + .5
-            if xf != lastx:
-                self.draw_line(lastx, lasty, xf, y)
-                lastx = xf
-                lasty = y
-        self.pop_line_color()
+            xs.append(xf)
+            ys.append(math.sin(xf * waves * 2 * math.pi) / 2 + .5)
+        self.draw_lines(xs, ys, color="bright_yellow")
 
 class FftPlot(TuiPlot):
     def __init__(
@@ -409,7 +407,8 @@ class FftPlot(TuiPlot):
                 self.which_fft = 0
             else:
                 self.which_fft += 1
-            await self._parent.post_message(RenderableUpdate(self))
+            self.clear()
+            await self._parent.post_message(RenderableUpdate(self, self))
 
 class SampleAppHeader(Header):
     def render(self) -> RenderableType:
@@ -633,10 +632,11 @@ async def process_command(command, width) -> str:
             # Add command to our history window
             hist_cmd = command.replace('"[', '"\\[').replace("'[","'\\[")
             cmd = "\n" + hist_cmd
-            if not tabs.has_tab("history"):
-                tabs.add_tab("history", "Command History", True)
-                tabs.select_tab("history")
-            tabs.add_renderable("history", cmd, False)
+            with tabs.batch():
+                if not tabs.has_tab("history"):
+                    tabs.add_tab("history", "Command History", True)
+                    tabs.select_tab("history")
+                tabs.add_renderable("history", cmd, False)
             
             try:
                 f = io.StringIO()
@@ -663,10 +663,11 @@ async def process_command(command, width) -> str:
     # Add command to our history window
     hist_cmd = command.replace('"[', '"\\[').replace("'[","'\\[")
     cmd = "\n" + hist_cmd+"\n" + resp
-    if not tabs.has_tab("history"):
-        tabs.add_tab("history", "Command History", True)
-        tabs.select_tab("history")
-    tabs.add_renderable("history", cmd, False)
+    with tabs.batch():
+        if not tabs.has_tab("history"):
+            tabs.add_tab("history", "Command History", True)
+            tabs.select_tab("history")
+        tabs.add_renderable("history", cmd, False)
 
     return resp
 
@@ -720,40 +721,42 @@ class MyApp(App):
         # Create our tabs
         self.body = Tabs(border_style=Style(color="blue"), border_focus_style=Style(color="green"))
         tabs = self.body
-        self.body.add_tab("history", "Command History", True)
-        self.body.add_tab("controls", "Controls")
-        self.body.add_tab("graph", "Time Plot")
-        self.body.add_tab("fft", "FFT Plot")
-        self.body.add_tab("graphics", "Graphics")
-        self.body.add_tab("pbm", "PBM")
-        self.body.add_tab("3d", "Stereograph")
-
-        # Add content to the command history tab
-        cmdText = "[yellow]Command History\n\n[white]This is an example of a Dynamic Widget that displays text which can be changed dynamically.\n\n"
-        cmdText += 'Try a command in the Command Window something like:\n  x=Panel.fit("\[on red]Hello World",style="on blue")\n'
-        cmdText += '  print(x)\n  inspect(x)'
-        cmdHistory = Dynamic(cmdText,name="history")
-        self.body.add_renderable("history", cmdHistory, True)
-
-        # Add content to the controls tab
-        self.ctrl_table = DynamicTable("controls")
-        ctrl_table = self.ctrl_table
-        self.ctrl_table.add_column("Control")
-        self.ctrl_table.add_column("Value")
-        self.ctrl_table.add_column("Sample")
-        self.ctrl_table.add_row(*["Radio Type", "large", Radiobutton("Example",radiotype="large",selected=True)])
-        self.ctrl_table.add_row(*["Radio Color", "blue", Radiobutton("Example",radiotype="large",radiocolor="blue",selected=True)])
-        self.ctrl_table.add_row(*["Check Type", "large", Checkbutton("Example",checktype="large",checked=True)])
-        self.body.add_renderable("controls", Dynamic('Below is a "DynamicTable" that updates when the Droplist controls (left) update.\n',name="table"))
-        self.body.add_renderable("controls", self.ctrl_table)
-
-        self.stereo = PBMStereo(name="3d",style=Style(color="grey63"))
-        self.body.add_renderable("graph", Dynamic("Time Domain Plot",name="time"))
-        self.body.add_renderable("graph", TimePlot(name="graph",style=Style(color="grey63")))
-        self.body.add_renderable("fft", FftPlot(name="fft",style=Style(color="grey63")))
-        self.body.add_renderable("graphics", Graphics(name="graphics",style=Style(color="grey63")))
-        self.body.add_renderable("pbm", PBMSlideshow(name="pbm",style=Style(color="grey63")))
-        self.body.add_renderable("3d", self.stereo)
+        # Add all tabs and their content with a single repaint
+        with self.body.batch():
+            self.body.add_tab("history", "Command History", True)
+            self.body.add_tab("controls", "Controls")
+            self.body.add_tab("graph", "Time Plot")
+            self.body.add_tab("fft", "FFT Plot")
+            self.body.add_tab("graphics", "Graphics")
+            self.body.add_tab("pbm", "PBM")
+            self.body.add_tab("3d", "Stereograph")
+
+            # Add content to the command history tab
+            cmdText = "[yellow]Command History\n\n[white]This is an example of a Dynamic Widget that displays text which can be changed dynamically.\n\n"
+            cmdText += 'Try a command in the Command Window something like:\n  x=Panel.fit("\[on red]Hello World",style="on blue")\n'
+            cmdText += '  print(x)\n  inspect(x)'
+            cmdHistory = Dynamic(cmdText,name="history")
+            self.body.add_renderable("history", cmdHistory, True)
+
+            # Add content to the controls tab
+            self.ctrl_table = DynamicTable("controls")
+            ctrl_table = self.ctrl_table
+            self.ctrl_table.add_column("Control")
+            self.ctrl_table.add_column("Value")
+            self.ctrl_table.add_column("Sample")
+            self.ctrl_table.add_row(*["Radio Type", "large", Radiobutton("Example",radiotype="large",selected=True)])
+            self.ctrl_table.add_row(*["Radio Color", "blue", Radiobutton("Example",radiotype="large",radiocolor="blue",selected=True)])
+            self.ctrl_table.add_row(*["Check Type", "large", Checkbutton("Example",checktype="large",checked=True)])
+            self.body.add_renderable("controls", Dynamic('Below is a "DynamicTable" that updates when the Droplist controls (left) update.\n',name="table"))
+            self.body.add_renderable("controls", self.ctrl_table)
+
+            self.stereo = PBMStereo(name="3d",style=Style(color="grey63"))
+            self.body.add_renderable("graph", Dynamic("Time Domain Plot",name="time"))
+            self.body.add_renderable("graph", TimePlot(name="graph",style=Style(color="grey63")))
+            self.body.add_renderable("fft", FftPlot(name="fft",style=Style(color="grey63")))
+            self.body.add_renderable("graphics", Graphics(name="graphics",style=Style(color="grey63")))
+            self.body.add_renderable("pbm", PBMSlideshow(name="pbm",style=Style(color="grey63")))
+            self.body.add_renderable("3d", self.stereo)
 
         # Create the bottom Command Line Interface (CLI) and the control panel
         self.cmd = CliInput(process_command, name="cli", title="Command Window", height=cli_height)
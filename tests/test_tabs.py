@@ -0,0 +1,120 @@
+import asyncio
+import io
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+from rich.console import Console
+
+from tui.widgets.dynamic import RenderableUpdate
+from tui.widgets.tabs import Tabs
+
+
+class Lines:
+    """ Renderable of numbered lines whose count can change """
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def __rich_console__(self, console, options):
+        yield "\n".join(f"line {i}" for i in range(self.count))
+
+
+def make_tabs(*names: str) -> Tabs:
+    tabs = Tabs()
+    for name in names:
+        tabs.add_tab(name, name.title())
+    return tabs
+
+
+def render(tabs: Tabs) -> str:
+    tabs._tabs.height = 12
+    console = Console(width=60, height=12, file=io.StringIO(), color_system=None)
+    console.print(tabs._tabs)
+    return console.file.getvalue()
+
+
+def click(tabs: Tabs, x: int) -> None:
+    asyncio.run(tabs.on_click(SimpleNamespace(x=x, y=1)))
+
+
+class ScrollTest(unittest.TestCase):
+    def test_offset_clamped_when_content_shrinks(self):
+        tabs = make_tabs("one")
+        content = Lines(50)
+        tabs.add_renderable("one", content)
+        render(tabs)
+        tab = tabs._tabs.tabs["one"]
+        tab.at_bottom = False
+        self.assertEqual(tab.scroll_offset, 50 - tabs._tabs.child_height)
+
+        content.count = 20
+        tab.need_rerender = True
+        text = render(tabs)
+        self.assertEqual(tab.scroll_offset, 20 - tabs._tabs.child_height)
+        self.assertIn("line 19", text)
+
+
+class ClickTest(unittest.TestCase):
+    def setUp(self):
+        self.tabs = make_tabs("one", "two", "three")
+        render(self.tabs)
+        self.extents = self.tabs._tabs.tab_extent_list
+
+    def test_click_at_tab_edges(self):
+        for x1, x2, name in self.extents:
+            for x in (x1, x2):
+                self.tabs._tabs.selected = None
+                click(self.tabs, x)
+                self.assertEqual(self.tabs._tabs.selected, name)
+
+    def test_click_outside_tabs(self):
+        gaps = [x2 + 1 for x1, x2, name in self.extents if x2 + 1 < self.extents[-1][0]]
+        gaps = [x for x in gaps if all(not x1 <= x <= x2 for x1, x2, name in self.extents)]
+        for x in gaps + [self.extents[0][0] - 1, self.extents[-1][1] + 1, 59]:
+            self.tabs._tabs.selected = "two"
+            click(self.tabs, x)
+            self.assertEqual(self.tabs._tabs.selected, "two")
+
+
+class BatchTest(unittest.TestCase):
+    def test_batch_refreshes_once(self):
+        tabs = make_tabs()
+        with mock.patch.object(tabs, "refresh") as refresh:
+            with tabs.batch():
+                for name in ("one", "two", "three"):
+                    tabs.add_tab(name, name.title())
+                    tabs.add_renderable(name, name)
+                tabs.select_tab("two")
+                self.assertEqual(refresh.call_count, 0)
+            self.assertEqual(refresh.call_count, 1)
+
+
+class RenderableUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.tabs = make_tabs("one", "two")
+        self.content = Lines(3)
+        self.tabs.add_renderable("one", "text")
+        self.tabs.add_renderable("two", self.content)
+
+    def need_rerender(self) -> list:
+        return [tab.name for tab in self.tabs._tabs.tabs.values() if tab.need_rerender]
+
+    def test_only_the_source_tab_rerenders(self):
+        asyncio.run(self.tabs.handle_renderable_update(RenderableUpdate(self, self.content)))
+        self.assertEqual(self.need_rerender(), ["two"])
+
+    def test_foreign_source_is_ignored(self):
+        # A renderable that is in no tab has nothing to redraw
+        updates = self.tabs._update_required
+        asyncio.run(self.tabs.handle_renderable_update(RenderableUpdate(self, Lines(1))))
+        self.assertEqual(self.need_rerender(), [])
+        self.assertEqual(self.tabs._update_required, updates)
+
+    def test_no_source_rerenders_all_tabs(self):
+        asyncio.run(self.tabs.handle_renderable_update(RenderableUpdate(self)))
+        self.assertEqual(self.need_rerender(), ["one", "two"])
+
+
+if __name__ == "__main__":
+    unittest.main()
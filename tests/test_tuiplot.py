@@ -0,0 +1,285 @@
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+from rich.console import Console
+from rich.style import Style
+from rich.text import Text
+
+from tui.widgets import tuiplot
+from tui.widgets.tuiplot import _clip_line_steps, Erase, PlotAnnotation, PlotAxis, TuiPlot, _text_key
+
+
+def make_plot(plot_class: type = TuiPlot) -> TuiPlot:
+    plot = plot_class()
+    plot.set_height(12)
+    plot.set_width(40)
+    plot.set_x_extents(0, 10)
+    plot.set_y_extents(0, 10)
+    return plot
+
+
+def draw(plot_class: type, numba: bool) -> tuple:
+    """ Draws a plot with or without the numba kernels and returns copies of
+        the canvas and palettes """
+    plot = make_plot(plot_class)
+    plot._alloc_canvas()
+    with mock.patch.object(tuiplot, "have_numba", numba):
+        plot.render_canvas()
+    return plot.canvas.copy(), plot.palette.copy(), plot.block_palette.copy()
+
+
+def render_text(plot: TuiPlot) -> str:
+    console = Console(width=plot.width + 2, file=io.StringIO(), color_system=None)
+    console.print(plot.render())
+    return console.file.getvalue()
+
+
+class LinePlot(TuiPlot):
+    """ Draws lines in every style, some partly or fully off the canvas """
+
+    def render_canvas(self) -> None:
+        rng = np.random.default_rng(1)
+        lines = [
+            (-5, -5, -1, -2),       # fully off the canvas
+            (12, 3, 15, 9),
+            (3, -4, 3, 14),         # vertical, clipped at both ends
+            (-2, 6, 12, 6),         # horizontal, clipped at both ends
+            (4, 4, 4, 4),           # single point
+            (11, 11, 11, 11),
+        ]
+        lines.extend(rng.uniform(-4, 14, (40, 4)))
+        self.push_line_color("red")
+        for line in lines:
+            self.draw_line(*line)
+        self.push_line_color(Erase())
+        for line in rng.uniform(-4, 14, (10, 4)):
+            self.draw_line(*line)
+        self.pop_line_color()
+        self.push_block_chars()
+        for line in rng.uniform(-4, 14, (10, 4)):
+            self.draw_line(*line, color="blue")
+        self.pop_block_chars()
+        self.pop_line_color()
+
+
+class CirclePlot(TuiPlot):
+    """ Draws circles in every style, some partly off the canvas """
+
+    def render_canvas(self) -> None:
+        self.draw_circle(5, 5, 8, color="red")
+        self.draw_circle(1, 9, 12, filled=True, color="green")
+        self.draw_circle(9, 1, 6, filled=True)
+        self.push_block_chars()
+        self.draw_circle(8, 6, 10, color="blue")
+        self.draw_circle(0, 0, 9, filled=True)
+        self.pop_block_chars()
+        self.push_line_color(Erase())
+        self.draw_circle(5, 5, 4, filled=True)
+        self.draw_circle(10, 10, 7)
+        self.pop_line_color()
+
+
+class PolylinePlot(TuiPlot):
+    """ Draws polylines in every style with draw_lines """
+
+    use_draw_lines = True
+
+    def polyline(self, x, y) -> None:
+        if self.use_draw_lines:
+            self.draw_lines(x, y)
+        else:
+            for i in range(len(x)-1):
+                self.draw_line(x[i], y[i], x[i+1], y[i+1])
+
+    def render_canvas(self) -> None:
+        rng = np.random.default_rng(2)
+        x = rng.uniform(-3, 13, 30)
+        y = rng.uniform(-3, 13, 30)
+        self.push_line_color("red")
+        self.polyline(x, y)
+        # Vertical, horizontal and repeated points
+        self.polyline([5, 5, 5, 8, 8, -2], [1, 9, 9, 9, -4, 12])
+        self.push_block_chars()
+        self.polyline(x[::-1], y + 1)
+        self.pop_block_chars()
+        self.push_line_color(Erase())
+        self.polyline(x[:10], y[:10])
+        self.pop_line_color()
+        self.pop_line_color()
+
+
+class SegmentsPlot(PolylinePlot):
+    """ Draws the same polylines as PolylinePlot, one draw_line at a time """
+
+    use_draw_lines = False
+
+
+class CountingPlot(TuiPlot):
+    """ Counts the calls to render_canvas """
+
+    def __init__(self):
+        super().__init__()
+        self.drawn = 0
+
+    def render_canvas(self) -> None:
+        self.drawn += 1
+        self.draw_line(0, 0, 10, 10)
+
+
+def walk_steps(xl, yl, xr, yr, steep, x_min, x_max, y_span):
+    """ Brute force _clip_line_steps that tries every step of the line """
+    dx = xr - xl
+    dy = abs(yr - yl)
+    y_step = 1 if yr > yl else -1
+    steps = []
+    for k in range(dx+1):
+        major = xl + k
+        minor = yl + y_step * ((2*dy*k + max(dx-1, 0)) // max(2*dx, 1))
+        x, y = (minor, major) if steep else (major, minor)
+        if x_min <= x < x_max and 0 <= y < y_span:
+            steps.append(k)
+    return (steps[0], steps[-1]) if steps else None
+
+
+class NumbaParityTest(unittest.TestCase):
+    """ The numba kernels and the pure NumPy paths draw the same dots """
+
+    def assert_parity(self, plot_class: type) -> None:
+        with_numba = draw(plot_class, True)
+        without = draw(plot_class, False)
+        self.assertTrue(without[0].any())
+        for a, b in zip(with_numba, without):
+            np.testing.assert_array_equal(a, b)
+
+    def test_lines(self):
+        self.assert_parity(LinePlot)
+
+    def test_circles(self):
+        self.assert_parity(CirclePlot)
+
+
+class ClipLineStepsTest(unittest.TestCase):
+    def assert_steps(self, xl, yl, xr, yr, steep):
+        self.assertEqual(_clip_line_steps(xl, yl, xr, yr, steep, 0, 40, 30),
+                walk_steps(xl, yl, xr, yr, steep, 0, 40, 30))
+
+    def test_edge_cases(self):
+        for line in ((-20, -20, -10, -15, False),   # fully off the canvas
+                     (50, 5, 60, 25, False),
+                     (-5, 7, 50, 7, True),          # vertical
+                     (-5, -3, 50, -3, True),
+                     (-5, 10, 60, 10, False),       # horizontal
+                     (0, 30, 39, 30, False),
+                     (5, 5, 5, 5, False),           # single point
+                     (50, 5, 50, 5, False),
+                     (0, 29, 39, 0, False)):
+            with self.subTest(line=line):
+                self.assert_steps(*line)
+
+    def test_random_lines(self):
+        rng = np.random.default_rng(3)
+        for xl, yl, xr, yr, steep in rng.integers(-60, 70, (500, 5)):
+            if xr < xl:
+                xl, yl, xr, yr = xr, yr, xl, yl
+            self.assert_steps(int(xl), int(yl), int(xr), int(yr), bool(steep & 1))
+
+
+class FrameCacheTest(unittest.TestCase):
+    def test_idle_render_reuses_frame(self):
+        plot = make_plot(CountingPlot)
+        frame = plot.render()
+        self.assertIs(plot.render(), frame)
+        self.assertEqual(plot.drawn, 1)
+
+    def test_clear_redraws(self):
+        plot = make_plot(CountingPlot)
+        frame = plot.render()
+        plot.clear()
+        self.assertIsNot(plot.render(), frame)
+        self.assertEqual(plot.drawn, 2)
+
+    def test_setter_redraws(self):
+        plot = make_plot(CountingPlot)
+        plot.render()
+        plot.set_y_extents(0, 20)
+        plot.render()
+        self.assertEqual(plot.drawn, 2)
+
+
+class AxisCacheTest(unittest.TestCase):
+    def test_one_entry_per_kind(self):
+        plot = make_plot()
+        axis = PlotAxis(0, 10, 3, ".1f")
+        plot.add_x_axis(PlotAxis(0, 10, 3, ".1f"))
+        plot.add_y_axis(axis)
+        plot.add_x_label("x")
+        plot.add_y_label("y")
+        for top in range(10, 20):
+            axis.max_value = top
+            plot.render()
+        kinds = [key[0] for key in plot._axis_cache]
+        self.assertEqual(len(kinds), len(set(kinds)))
+
+    def test_label_key_covers_style(self):
+        self.assertNotEqual(_text_key(Text("y")), _text_key(Text("y", style="red")))
+
+
+class OverlapTest(unittest.TestCase):
+    def test_right_annotation_on_top(self):
+        # Whatever the add order, the annotation further right is drawn on top
+        left = (2, 5, Text("aaaaaaaa", style=Style(color="red")))
+        right = (3, 5, Text("bbbbbbbb", style=Style(color="blue")))
+        for first, second in ((left, right), (right, left)):
+            plot = make_plot()
+            plot.add_annotation(*first)
+            plot.add_annotation(*second)
+            line = next(l for l in render_text(plot).splitlines() if "b" in l)
+            self.assertRegex(line, "a+bbbbbbbb ")
+
+
+class DrawLinesTest(unittest.TestCase):
+    def test_matches_draw_line(self):
+        for a, b in zip(draw(PolylinePlot, False), draw(SegmentsPlot, False)):
+            np.testing.assert_array_equal(a, b)
+
+
+class AnnotationsTest(unittest.TestCase):
+    def test_add_annotation(self):
+        plot = TuiPlot()
+        plot.add_annotation(1, 2, "a")
+        plot.add_annotation(3.5, 4, Text("b"))
+        self.assertEqual(plot.annotations,
+                (PlotAnnotation(1.0, 2.0, "a"), PlotAnnotation(3.5, 4.0, Text("b"))))
+
+    def test_annotations_setter(self):
+        plot = TuiPlot()
+        plot.add_annotation(1, 2, "a")
+        plot.annotations = [PlotAnnotation(5, 6, "c")]
+        self.assertEqual(plot.annotations, (PlotAnnotation(5.0, 6.0, "c"),))
+
+    def test_annotations_is_read_only(self):
+        # Appending to the snapshot would silently do nothing, so it must fail
+        plot = TuiPlot()
+        with self.assertRaises(AttributeError):
+            plot.annotations.append(PlotAnnotation(1, 2, "a"))
+
+
+class AxisTest(unittest.TestCase):
+    def test_axis_changed_in_place(self):
+        # Autoscaling plots update their axes in place between renders
+        plot = make_plot()
+        plot.set_width(60)
+        plot.set_height(20)
+        axis = PlotAxis(0, 10, 3, ".1f")
+        plot.add_x_axis(PlotAxis(0, 10, 3, ".1f"))
+        plot.add_y_axis(axis)
+        self.assertNotIn("20.0", render_text(plot))
+
+        axis.max_value = 20
+        self.assertIn("20.0", render_text(plot))
+
+
+if __name__ == "__main__":
+    unittest.main()
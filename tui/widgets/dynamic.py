@@ -7,10 +7,15 @@ from rich.style import StyleType
 from rich.styled import Styled
 from textual.widget import Widget
 from textual.reactive import Reactive
-from textual.message import Message
+from textual.message import Message, MessageTarget
 
 class RenderableUpdate(Message):
-    pass
+    """ Posted when a renderable's content changes.  source is the renderable
+        that changed, or None if every renderable should be redrawn. """
+
+    def __init__(self, sender: MessageTarget, source: RenderableType | None = None) -> None:
+        super().__init__(sender)
+        self.source = source
 
 class Dynamic(Widget):
     def __init__(
@@ -41,7 +46,7 @@ class Dynamic(Widget):
 
     async def update_renderable(self, renderable: RenderableType):
         self.renderable = renderable
-        await self._parent.post_message(RenderableUpdate(self))
+        await self._parent.post_message(RenderableUpdate(self, self))
 
     async def require_update(self):
-        await self._parent.post_message(RenderableUpdate(self))
+        await self._parent.post_message(RenderableUpdate(self, self))
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import sys
+from bisect import bisect_right
 from typing import Optional, TYPE_CHECKING, NamedTuple
 from dataclasses import dataclass
-from contextlib import suppress
+from contextlib import suppress, contextmanager
 
 from rich.box import Box, ROUNDED
 
@@ -39,6 +40,7 @@ class Tab:
     name: str
     label: str
     line_cache: list(Segment)
+    width_cache: list(int)
     renderables: list(TabContent)
     new_renderables: list(TabContent)
     scroll_offset: int = 0
@@ -104,6 +106,7 @@ class TabsRenderable(JupyterMixin):
         self.highlight = highlight
         self.tabs = {}
         self.tab_extents = {}
+        self.tab_extent_list = []
         self.first_tab = 0
         self.selected = None
         self._has_focus = False
@@ -174,7 +177,24 @@ class TabsRenderable(JupyterMixin):
             return subtitle_text
         return None
 
-    def render_tabs(self, box, width, style, border_style):
+    def _render_tabs_into(self, out, console, title_text, box, width, style, border_style) -> None:
+        """ Appends the segments for the tab header rows to the 'out' list """
+        out_append = out.append
+
+        # Consecutive pieces with the same style are joined into a single
+        # Segment, so a header row costs one Segment per style change
+        row = []
+        def emit(text, seg_style):
+            if row and row[-1][1] == seg_style:
+                row[-1][0] += text
+            else:
+                row.append([text, seg_style])
+
+        def flush():
+            out.extend([Segment(text, seg_style) for text, seg_style in row])
+            out_append(new_line)
+            row.clear()
+
         # Calculate the width of each tab
         tab_widths = []
         total_width = 0
@@ -236,25 +256,27 @@ class TabsRenderable(JupyterMixin):
         # ============================
         if len(self.tabs) == 0:
             if title_text is None or width <= 4:
-                yield Segment(box.get_top([width - 2]), border_style)
+                out_append(Segment(box.get_top([width - 2]), border_style))
             else:
                 title_text.align(self.title_align, width - 4, character=box.top)
-                yield Segment(box.top_left + box.top, border_style)
-                yield from console.render(title_text)
-                yield Segment(box.top + box.top_right, border_style)
+                out_append(Segment(box.top_left + box.top, border_style))
+                out.extend(console.render(title_text))
+                out_append(Segment(box.top + box.top_right, border_style))
+            out_append(new_line)
         else:
             # ==========================
             # Top line of the tabs
             # ==========================
-            yield Segment("  ", border_style)
+            emit("  ", border_style)
             tabno = 0
             x = 2
             rem = width-2
             self.tab_extents = {}
+            self.tab_extent_list = []
 
             # If the first tab isn't displayed, then show a "-" tab
             if self.first_tab > 0:
-                yield Segment(box.get_top([3]), border_style)
+                emit(box.get_top([3]), border_style)
                 x += 5
                 total_width += 5
                 rem -= 5
@@ -268,26 +290,27 @@ class TabsRenderable(JupyterMixin):
                     if w+2 >= rem:
                         w = rem-3
                     if w >= 0:
-                        yield Segment(box.get_top([w]), border_style)
+                        emit(box.get_top([w]), border_style)
                         self.tab_extents[t] = (x, x+w+1)
+                        self.tab_extent_list.append((x, x+w+1, t))
                         x += w+2
                         rem -= w+2
                 tabno += 1
             if width-2 > total_width:
-                yield Segment(f"{' ':{width-total_width-2}}", border_style)
-            yield new_line
+                emit(f"{' ':{width-total_width-2}}", border_style)
+            flush()
 
             # ==========================
             # The tab text
             # ==========================
-            yield Segment("  ", border_style)
+            emit("  ", border_style)
             rem = width-2
 
             # If the first tab isn't displayed, then show a "-" tab
             if self.first_tab > 0:
-                yield Segment(box.mid_left, border_style)
-                yield Segment(f' - ', style)
-                yield Segment(box.mid_right, border_style)
+                emit(box.mid_left, border_style)
+                emit(f' - ', style)
+                emit(box.mid_right, border_style)
                 rem -= 5
 
             tabno = 0
@@ -300,36 +323,36 @@ class TabsRenderable(JupyterMixin):
                         w = rem-5
 
                     if w > 1:
-                        yield Segment(box.mid_left, border_style)
-                        yield Segment(f' {tab.label[:(w-2 if tab.has_close else w)]} {"❎" if tab.has_close else ""}', style)
-                        yield Segment(box.mid_right, border_style)
+                        emit(box.mid_left, border_style)
+                        emit(f' {tab.label[:(w-2 if tab.has_close else w)]} {"❎" if tab.has_close else ""}', style)
+                        emit(box.mid_right, border_style)
                         rem -= w+4
                     elif w > -2:
-                        yield Segment(box.mid_left, border_style)
-                        yield Segment(f'{tab.label[:w+2]}', style)
-                        yield Segment(box.mid_right, border_style)
+                        emit(box.mid_left, border_style)
+                        emit(f'{tab.label[:w+2]}', style)
+                        emit(box.mid_right, border_style)
                         break
                     elif w > -3:
-                        yield Segment(box.mid_left, border_style)
-                        yield Segment(box.mid_right, border_style)
+                        emit(box.mid_left, border_style)
+                        emit(box.mid_right, border_style)
                         break
                 else:
                     self.prev_tab = t
                 tabno += 1
             if width-2 > total_width:
-                yield Segment(f"{' ':{width-total_width-2}}", border_style)
-            yield new_line
+                emit(f"{' ':{width-total_width-2}}", border_style)
+            flush()
 
             # ==========================
             # The tab bottom
             # ==========================
             tabno = 0
             rem = width-2
-            yield Segment(box.top_left+box.top, border_style)
+            emit(box.top_left+box.top, border_style)
             if self.first_tab > 0:
-                yield Segment(box.bottom_divider, border_style)
-                yield Segment(box.bottom*3, border_style)
-                yield Segment(box.bottom_divider, border_style)
+                emit(box.bottom_divider, border_style)
+                emit(box.bottom*3, border_style)
+                emit(box.bottom_divider, border_style)
                 rem -= 5
 
             for t in self.tabs:
@@ -340,22 +363,22 @@ class TabsRenderable(JupyterMixin):
                         w = rem-5
                     if t == self.selected:
                         if w > -2:
-                            yield Segment(box.bottom_right + f'{" ":{w+2}}' + box.bottom_left, border_style)
+                            emit(box.bottom_right + f'{" ":{w+2}}' + box.bottom_left, border_style)
                             rem -= w+4
                     else:
                         if w > -3:
-                            yield Segment(box.bottom_divider + f'{box.bottom*(w+2)}' + box.bottom_divider, border_style)
+                            emit(box.bottom_divider + f'{box.bottom*(w+2)}' + box.bottom_divider, border_style)
                             rem -= w+4
                             if w < tab_widths[tabno]-4:
                                 break
                         elif w == -3:
-                            yield Segment(box.bottom, border_style)
+                            emit(box.bottom, border_style)
                             rem -= 1
                             break
                 tabno += 1
             #yield Segment(f"{box.top*(width-total_width-3)}{box.top_right}", border_style)
-            yield Segment(f"{box.top*(rem-1)}{box.top_right}", border_style)
-        yield new_line
+            emit(f"{box.top*(rem-1)}{box.top_right}", border_style)
+            flush()
 
     def render_tab_content(self,
             tab,
@@ -388,23 +411,30 @@ class TabsRenderable(JupyterMixin):
 
         for l in lines:
             new_l = []
+            # Width of each cached segment, measured once here so scrolling
+            # doesn't need to decode the segments on every frame
+            new_w = []
             col = 0
             emojis = [ "⚫", '🌕', '👉', "🔳", "✅", '🔵', '🔴', '⚪', "❎" ]
             for s in l:
                 if isinstance(s, Segment) and not "\x1b" in s.text:
                     new_l.append(s)
+                    new_w.append(len(decoder.decode_line(s.text)))
                     col += len(s.text)
                     col += len([x for x in emojis if x in s.text])
                 elif len(s.text.strip()) > 0 or len(s.text) == 1:
                     for item in self.decode_line(s.text):
                         seg = Segment(str(item), item.style)
                         new_l.append(seg)
+                        new_w.append(len(seg.text))
                     line = decoder.decode_line(s.text)
                     col += len(line)
                     col += len([x for x in emojis if x in line])
             if width-col-2-pad_total > 0:
                 new_l.append(Segment(f"{' ':{width-col-2-pad_total}}"))
+                new_w.append(width-col-2-pad_total)
             tab.line_cache.append(new_l)
+            tab.width_cache.append(new_w)
 
     def __rich_console__(
         self, console: "Console", options: "ConsoleOptions"
@@ -447,7 +477,9 @@ class TabsRenderable(JupyterMixin):
         # ============================
         # Render the tabs
         # ============================
-        yield from self.render_tabs(box, width, style, border_style)
+        out: list(Segment) = []
+        out_append = out.append
+        self._render_tabs_into(out, console, title_text, box, width, style, border_style)
 
         # ============================
         # Render the tab content
@@ -468,6 +500,7 @@ class TabsRenderable(JupyterMixin):
             # Test if re-render required
             if tab.render_width != width or tab.render_height != height or tab.need_rerender or tab.dynamic_content:
                 tab.line_cache = []
+                tab.width_cache = []
                 if len(tab.renderables) > 0:
                     self.render_tab_content(
                             tab, tab.renderables,
@@ -493,56 +526,55 @@ class TabsRenderable(JupyterMixin):
                 tab.new_renderables = []
 
             lines = tab.line_cache
-            start = 0
-            if tab.at_bottom:
-                tab.scroll_offset = len(lines)-child_height
-                if tab.scroll_offset < 0:
-                    tab.scroll_offset = 0
-            for line in lines:
-                if start >= tab.scroll_offset:
-                    yield line_start
-                    yield left_pad
-                    rem = child_width
-                    for s in line:
-                        w = len(decoder.decode_line(s.text))
-                        if w <= rem:
-                            yield s
-                            rem -= w
-                        else:
-                            # Create a partial segment
-                            yield Segment(s.text[:rem], s.style)
-                            break
-                    yield right_pad
-                    yield line_end
-                    yield new_line
-                    rows += 1
-                    if rows == child_height:
+
+            # Keep the scroll offset within the cached lines
+            max_offset = max(0, len(lines)-child_height)
+            if tab.at_bottom or tab.scroll_offset > max_offset:
+                tab.scroll_offset = max_offset
+
+            # Only the visible window of lines is walked
+            visible = lines[tab.scroll_offset : tab.scroll_offset + child_height]
+            widths = tab.width_cache[tab.scroll_offset : tab.scroll_offset + child_height]
+            for line, line_widths in zip(visible, widths):
+                out_append(line_start)
+                out_append(left_pad)
+                rem = child_width
+                for s, w in zip(line, line_widths):
+                    if w <= rem:
+                        out_append(s)
+                        rem -= w
+                    else:
+                        # Create a partial segment
+                        out_append(Segment(s.text[:rem], s.style))
                         break
-                else:
-                    start += 1
+                out_append(right_pad)
+                out_append(line_end)
+                out_append(new_line)
+            rows = len(visible)
 
         if self.expand and rows != child_height:
             for x in range(child_height-rows):
-                yield line_start
-                yield left_pad
-                yield Segment(f"{' ' * child_width}", style)
-                yield right_pad
-                yield line_end
-                yield new_line
+                out_append(line_start)
+                out_append(left_pad)
+                out_append(Segment(f"{' ' * child_width}", style))
+                out_append(right_pad)
+                out_append(line_end)
+                out_append(new_line)
 
         subtitle_text = self._subtitle
         if subtitle_text is not None:
             subtitle_text.style = border_style
 
         if subtitle_text is None or width <= 4:
-            yield Segment(box.get_bottom([width - 2]), border_style)
+            out_append(Segment(box.get_bottom([width - 2]), border_style))
         else:
             subtitle_text.align(self.subtitle_align, width - 4, character=box.bottom)
-            yield Segment(box.bottom_left + box.bottom, border_style)
-            yield from console.render(subtitle_text)
-            yield Segment(box.bottom + box.bottom_right, border_style)
+            out_append(Segment(box.bottom_left + box.bottom, border_style))
+            out.extend(console.render(subtitle_text))
+            out_append(Segment(box.bottom + box.bottom_right, border_style))
 
-        yield new_line
+        out_append(new_line)
+        return out
 
     def __rich_measure__(
         self, console: "Console", options: "ConsoleOptions"
@@ -663,6 +695,8 @@ class Tabs(Widget, can_focus=True):
                 border_style=border_style,
                 border_focus_style=border_focus_style
         )
+        self._batch_depth = 0
+        self._batch_dirty = False
 
     _tabs: Reactive[TabsRenderable] = Reactive(TabsRenderable)
     _has_focus: Reactive[bool] = Reactive(False)
@@ -676,6 +710,26 @@ class Tabs(Widget, can_focus=True):
         self.child_region = Region(region.x+3, region.y+4, region.width-5, region.height-4)
         return self._tabs
 
+    def _request_update(self) -> None:
+        """ Repaint the tabs now, or at the end of the enclosing batch() """
+        if self._batch_depth > 0:
+            self._batch_dirty = True
+        else:
+            self._update_required += 1
+
+    @contextmanager
+    def batch(self):
+        """ Context manager that coalesces the updates made within it into a
+            single repaint, e.g. when adding many renderables at once """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self._update_required += 1
+
     def add_tab(self,
             name: str,
             label: str,
@@ -687,13 +741,14 @@ class Tabs(Widget, can_focus=True):
             label=label,
             new_renderables=[],
             line_cache=[],
+            width_cache=[],
             renderables=[],
             has_close = has_close,
             _parent = self,
         )
         if self._tabs.selected == None:
             self._tabs.selected = name
-            self._update_required += 1
+            self._request_update()
 
     def add_renderable(self,
             tab_name: str,
@@ -704,12 +759,12 @@ class Tabs(Widget, can_focus=True):
         if not isinstance(content, str):
             content._parent = self
         self._tabs.tabs[tab_name].new_renderables.append(TabContent(content, wrap, expand_height))
-        self._update_required += 1
+        self._request_update()
 
     def select_tab(self, name: str) -> None:
         if name in self._tabs.tabs:
             self._tabs.selected = name
-            self._update_required += 1
+            self._request_update()
 
     async def on_focus(self, event: events.Focus) -> None:
         self._tabs._has_focus = True
@@ -728,46 +783,48 @@ class Tabs(Widget, can_focus=True):
         y = event.y
         x = event.x
         if y <= 2:
-            # Determine if x is within any of the tabs
-            prev = None
-            for t in self._tabs.tab_extents:
-                x1, x2 = self._tabs.tab_extents[t]
-                if x >= x1 and x <= x2:
-                    # Check if has_close and mouse is in the "X"
-                    if self._tabs.tabs[t].has_close and x >= x2-2:
-                        # Find the name of the next tab in case this is the first
-                        next_tab = None
-                        found_tab = False
-                        for t2 in self._tabs.tab_extents:
-                            if found_tab:
-                                next_tab = t2
-                                break
-                            elif t2 == t:
-                                found_tab = True
-                        await self.on_close_tab(t)
-                        if not t in self._tabs.tabs:
-                            if prev is not None:
-                                self._tabs.selected = prev
-                            else:
-                                self._tabs.selected = next_tab
-                    else:
-                        self._tabs.selected = t
+            # Determine if x is within any of the tabs.  The extent list is
+            # sorted by x, so search for the last tab starting at or before x
+            extents = self._tabs.tab_extent_list
+            i = bisect_right(extents, (x, sys.maxsize)) - 1
+            if i >= 0 and x <= extents[i][1]:
+                x1, x2, t = extents[i]
+                # Check if has_close and mouse is in the "X"
+                if self._tabs.tabs[t].has_close and x >= x2-2:
+                    # Neighbouring tabs to select once this one is closed
+                    prev = extents[i-1][2] if i > 0 else None
+                    next_tab = extents[i+1][2] if i+1 < len(extents) else None
+                    await self.on_close_tab(t)
+                    if not t in self._tabs.tabs:
+                        if prev is not None:
+                            self._tabs.selected = prev
+                        else:
+                            self._tabs.selected = next_tab
+                else:
+                    self._tabs.selected = t
 
-                    self._update_required += 1
-                    break
-                prev = t
+                self._request_update()
             else:
                 # Test for click in prev_tab 
                 if self._tabs.prev_tab is not None:
                     if x >= 2 and x <= 6:
                         self._tabs.selected = self._tabs.prev_tab
-                        self._update_required += 1
+                        self._request_update()
 
     async def handle_renderable_update(self, message: RenderableUpdate) -> None:
-        # re-render all tabs
-        for t in self._tabs.tabs:
-            self._tabs.tabs[t].need_rerender = True
-        self._update_required += 1
+        # re-render the tabs holding the source, or all tabs if there is no
+        # source.  Updates from a renderable that is in no tab are ignored.
+        tabs = list(self._tabs.tabs.values())
+        source = getattr(message, 'source', None)
+        if source is not None:
+            tabs = [tab for tab in tabs
+                    if any(c.renderable is source for c in tab.renderables)
+                    or any(c.renderable is source for c in tab.new_renderables)]
+            if not tabs:
+                return
+        for tab in tabs:
+            tab.need_rerender = True
+        self._request_update()
 
     async def on_mouse_scroll_up(self, event: events.MouseScrollUp) -> None:
         if self._tabs.selected is not None:
@@ -778,7 +835,7 @@ class Tabs(Widget, can_focus=True):
                     tab.scroll_offset = len(tab.line_cache) - (self._tabs.child_height)
                 if tab.scroll_offset + self._tabs.child_height == len(tab.line_cache):
                     tab.at_bottom = True
-                self._update_required += 1
+                self._request_update()
 
     async def on_mouse_scroll_down(self, event: events.MouseScrollUp) -> None:
         if self._tabs.selected is not None:
@@ -788,7 +845,7 @@ class Tabs(Widget, can_focus=True):
                 if tab.scroll_offset < 0:
                     tab.scroll_offset = 0
                 tab.at_bottom = False
-                self._update_required += 1
+                self._request_update()
     
     async def on_close_tab(self, tab: Tab) -> None:
         del self._tabs.tabs[tab]
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from bisect import bisect_right
+from functools import lru_cache
 try:
     from PIL import Image
     have_pil = True
 except:
     have_pil = False
+try:
+    from numba import njit
+    have_numba = True
+except:
+    have_numba = False
+    def njit(*args, **kwargs):
+        """ Stand-in for numba.njit that leaves the function as plain Python """
+        return lambda func: func
 
 from rich.panel import Panel
 from rich.style import Style
 from rich.text import Text
-from rich.color import Color, ColorType
+from rich.color import Color
 from rich.color_triplet import ColorTriplet
 from rich.segment import Segment, Segments
 from textual.reactive import Reactive
@@ -20,11 +30,23 @@ import math
 import sys
 from typing import NamedTuple
 
+import numpy as np
+
 # Defines a color that erases dots vs. setting them to a color
 class Erase(Style):
     def __init__(self):
         super().__init__(conceal=True)
 
+# Braille bit of each dot of a 4x2 canvas cell, bottom canvas row first
+_BRAILLE_BITS = ((6, 7), (2, 5), (1, 4), (0, 3))
+
+# Block character bits of the lower and upper half of a canvas cell
+_BLOCK_LOWER_BITS = (1, 3)
+_BLOCK_UPPER_BITS = (0, 2)
+
+# UTF-8 encoding of each Braille pattern, with an empty cell as a space
+_BRAILLE_UTF8 = [b' '] + [chr(0x2800 + p).encode() for p in range(1, 256)]
+
 # Defines min/max canvas coordinates
 class PlotExtents(NamedTuple):
     xmin: int
@@ -32,6 +54,141 @@ class PlotExtents(NamedTuple):
     ymin: int
     ymax: int
 
+def _clip_line_steps(xl, yl, xr, yr, steep, x_min, x_max, y_span):
+    """ Returns the (first, last) Bresenham steps of the line from (xl, yl) to
+        (xr, yr) whose dots fall inside the plot, or None if none do.  Takes
+        the major axis coordinates first, as draw_line does. """
+
+    dx = xr - xl
+    dy = abs(yr - yl)
+    if steep:
+        major_lo, major_hi, minor_lo, minor_hi = 0, y_span, x_min, x_max
+    else:
+        major_lo, major_hi, minor_lo, minor_hi = x_min, x_max, 0, y_span
+
+    # Steps whose major coordinate is in range
+    k0 = max(0, major_lo - xl)
+    k1 = min(dx, major_hi - 1 - xl)
+
+    # The minor offset at step k, (2*dy*k + c) // d, never decreases with k,
+    # so the steps whose minor coordinate is in range also form a span
+    c = max(dx-1, 0)
+    d = max(2*dx, 1)
+    if yr > yl:
+        lo = minor_lo - yl
+        hi = minor_hi - 1 - yl
+    else:
+        lo = yl - minor_hi + 1
+        hi = yl - minor_lo
+    if dy == 0:
+        if lo > 0 or hi < 0:
+            return None
+    else:
+        k0 = max(k0, -((c - lo*d) // (2*dy)))
+        k1 = min(k1, -((c - (hi+1)*d) // (2*dy)) - 1)
+
+    if k0 > k1:
+        return None
+    return k0, k1
+
+@njit(cache=True, boundscheck=False)
+def _bresenham_numba(canvas, palette, block_palette, xl, yl, dx, dy, y_step,
+        k0, k1, steep, dot, style_id, block):
+    """ Integer Bresenham over steps k0..k1 that writes straight into the
+        canvas and the style-ID palettes.  The steps must already be clipped
+        to the plot (see _clip_line_steps). """
+
+    c = dx - 1 if dx > 0 else 0
+    d = 2*dx if dx > 0 else 1
+    err = 2*dy*k0 + c
+    y = yl + y_step * (err // d)
+    err = err % d
+    for x in range(xl+k0, xl+k1+1):
+        if steep:
+            cx = y
+            cy = x
+        else:
+            cx = x
+            cy = y
+        canvas[cy, cx] = dot
+        if style_id >= 0:
+            palette[cy >> 2, cx >> 1] = style_id
+            if block:
+                block_palette[cy >> 1, cx >> 1] = style_id
+        err += 2*dy
+        if err >= d:
+            err -= d
+            y += y_step
+
+@njit(cache=True, boundscheck=False)
+def _fill_numba(canvas, palette, block_palette, x1, x2, y1, y2, xmin, xmax, height,
+        dot, style_id, block):
+    """ Sets dots x1..x2 of canvas rows y1..y2 and their palette cells,
+        clipped to the plot.  Negative columns wrap around like single dot
+        writes. """
+
+    if y1 > y2:
+        y1, y2 = y2, y1
+    if y1 < 0:
+        y1 = 0
+    if y2 >= height:
+        y2 = height - 1
+    if y1 > y2:
+        return
+    if x1 > x2:
+        x1, x2 = x2, x1
+    if x1 < xmin:
+        x1 = xmin
+    if x2 >= xmax:
+        x2 = xmax - 1
+    if x1 > x2:
+        return
+    width = canvas.shape[1]
+    while x1 <= x2:
+        if x1 < 0:
+            # Write the wrapped part first.  The canvas width is even, so
+            # shifting by it keeps the palette cell.
+            lo = x1 + width
+            hi = min(x2, -1) + width
+            x1 = 0
+        else:
+            lo = x1
+            hi = x2
+            x1 = x2 + 1
+        canvas[y1:y2+1, lo:hi+1] = dot
+        if style_id >= 0:
+            palette[y1 >> 2:(y2 >> 2)+1, lo >> 1:(hi >> 1)+1] = style_id
+            if block:
+                block_palette[y1 >> 1:(y2 >> 1)+1, lo >> 1:(hi >> 1)+1] = style_id
+
+@njit(cache=True, boundscheck=False)
+def _circle_numba(canvas, palette, block_palette, xc, yc, radius, filled,
+        xmin, xmax, height, dot, style_id, block):
+    """ Midpoint circle that writes straight into the canvas and the
+        style-ID palettes.  Filled circles are drawn as horizontal spans. """
+
+    x = 0
+    y = radius
+    d = 3 - 2 * radius
+    while True:
+        if filled:
+            _fill_numba(canvas, palette, block_palette, xc-x, xc+x, yc+y, yc+y, xmin, xmax, height, dot, style_id, block)
+            _fill_numba(canvas, palette, block_palette, xc-x, xc+x, yc-y, yc-y, xmin, xmax, height, dot, style_id, block)
+            _fill_numba(canvas, palette, block_palette, xc-y, xc+y, yc+x, yc+x, xmin, xmax, height, dot, style_id, block)
+            _fill_numba(canvas, palette, block_palette, xc-y, xc+y, yc-x, yc-x, xmin, xmax, height, dot, style_id, block)
+        else:
+            for px, py in ((xc+x, yc+y), (xc-x, yc+y), (xc+x, yc-y), (xc-x, yc-y),
+                           (xc+y, yc+x), (xc-y, yc+x), (xc+y, yc-x), (xc-y, yc-x)):
+                _fill_numba(canvas, palette, block_palette, px, px, py, py, xmin, xmax, height, dot, style_id, block)
+        if y < x:
+            break
+        x += 1
+        if d > 0:
+            y -= 1
+            d += 4 * (x - y) + 10
+        else:
+            d += 4 * x + 6
+
 @dataclass
 class PlotAxis:
     min_value:  float
@@ -39,6 +196,49 @@ class PlotAxis:
     divisions:  int
     format_str: str = ":.1f"
 
+@lru_cache(maxsize=256)
+def _color_style(color: str) -> Style:
+    """ Returns the Style for a color name, reusing recently built ones """
+    return Style(color = color)
+
+def _axis_fields(axis: PlotAxis | None) -> tuple | None:
+    """ Returns the fields of an axis that its ticks and labels depend on """
+
+    if axis is None:
+        return None
+    return (axis.min_value, axis.max_value, axis.divisions, axis.format_str)
+
+def _text_key(text: str | Text) -> tuple:
+    """ Returns a hashable key for a str or Text label that covers its style """
+
+    if isinstance(text, Text):
+        return (text.plain, text.style)
+    return (text, None)
+
+def _splice(chars: list(str), start: int, text: str) -> list(str):
+    """ Overwrites chars from index start with text, in place where possible.
+        A negative start counts from the end, as it would splicing a str. """
+
+    if start < 0:
+        return chars[:start] + list(text) + chars[start+len(text):]
+    chars[start:start+len(text)] = text
+    return chars
+
+def _axis_labels(axis: PlotAxis, cached: tuple) -> tuple:
+    """ Returns (fields, tick label strings, widest label) of an axis, reusing
+        cached while the axis fields it was built from are unchanged """
+
+    fields = _axis_fields(axis)
+    if cached[0] == fields:
+        return cached
+    span = axis.max_value - axis.min_value
+    labels = []
+    for i in range(axis.divisions):
+        ratio = i / float(axis.divisions-1)
+        axis_val = axis.min_value + ratio * span
+        labels.append(f'{axis_val:{axis.format_str}}')
+    return fields, labels, max((len(label) for label in labels), default=0)
+
 @dataclass
 class PlotAnnotation:
     x:  float
@@ -76,41 +276,71 @@ class TuiPlot(Widget):
         self.x_label = None
         self.x_axis = None
         self.x_axis_style = None
-        self.annotations = []
+        # (fields, tick labels, widest label) of each axis, see _axis_labels()
+        self._x_axis_labels = (None, [], 0)
+        self._y_axis_labels = (None, [], 0)
+        # Annotations as parallel arrays, the first _ann_count entries used
+        self._ann_x = np.empty(0)
+        self._ann_y = np.empty(0)
+        self._ann_text = []
+        self._ann_count = 0
         self.title = None
         self.absolute_coords = False
         self.block_chars = 0
         self._block_char_list = [' ','▘','▖','▌','▝','▀','▞','▛','▗','▚','▄','▙','▐','▜','▟','█']
         self._timer = None
         self.render_count = 0
+        # Drawing area in canvas dots, see _update_geometry()
+        self._plot_width = 0
+        self._plot_height = 0
+        # (key, xscale, yscale, extents) of the last _scales() call
+        self._scale_cache = None
+        # Canvas and palette buffers, reused across frames of the same size
+        self.canvas = None
+        self.palette = None
+        self.block_palette = None
+        # Styles referenced by the palette's style IDs
+        self._style_table = []
+        self._style_index = {}
+        # Render attributes of each style ID, filled in by _add_style().  The
+        # entry for style ID -1 (no style) is kept last.
+        self._color_keys = {}
+        self._style_names = [None]
+        self._style_bolds = [False]
+        self._style_blocks = [False]
+        self._style_colors = [-1]
+        self._style_opens = [""]
+        self._style_open_bytes = [b""]
+        # Color tags as (plain, bold, not bold)
+        self._style_tags = [(b"", b"", b"")]
+        self._last_style = None
+        self._last_block = False
+        self._last_style_id = -1
+        # (key, renderable) of the last frame rendered
+        self._render_cache = None
+        # Bumped by every change to what is drawn, see _frame_key()
+        self._data_version = 0
+        # Prebuilt axis and label strings keyed by kind and inputs, see
+        # _set_axis_cache().  Cleared when the axes, labels or size change.
+        self._axis_cache = {}
 
     def render(self) -> RenderableType:
         """ Renders the graph canvas to a Panel with unicode characters """
 
-        # Create a canvas on which to render graphics
-        self.canvas = [[0 for col in range(self.width*2)] for row in range(self.height*4)]
-        self.palette = [[None for col in range(self.width)] for row in range(self.height)]
-        self.block_palette = [[None for col in range(self.width)] for row in range(self.height*2)]
+        # Reuse the last frame while nothing it depends on has changed
+        if self._render_cache is not None and self._render_cache[0] == self._frame_key():
+            return self._render_cache[1]
 
-        # Calculate Y axis size
-        axis_width = int(self.plot_width/2)+2
-        x_offset = 0
-        y_axis_width = 0
-        if self.y_axis is not None:
-            axis_width += 1
-            index = 0
-            y_span = self.y_axis.max_value - self.y_axis.min_value
-            y_vals = []
-            for i in range(self.y_axis.divisions):
-                ratio = i / float(self.y_axis.divisions-1)
-                axis_val = self.y_axis.min_value + ratio * y_span
-                axis_str = f'{axis_val:{self.y_axis.format_str}}'
-                y_vals.append(axis_str)
-                axis_str_len = len(axis_str)
-                if axis_str_len > y_axis_width:
-                    y_axis_width = axis_str_len
-        x_offset += y_axis_width
-        axis_width -= y_axis_width*2
+        # Clear the canvas on which to render graphics
+        if self.canvas is None or self.canvas.shape != (self.height*4, self.width*2):
+            self._alloc_canvas()
+        else:
+            self.canvas.fill(0)
+            self.palette.fill(-1)
+            self.block_palette.fill(-1)
+
+        # Make room for the Y axis
+        y_axis_width = self._y_axis_values()[1]
 
         # ============================================
         # Render graphics to the raw canvas
@@ -123,165 +353,258 @@ class TuiPlot(Widget):
         if self.x_min != self.x_max and self.y_min != self.y_max:
             self.render_canvas()
 
-        # Convert the canvas to and ASCII representation
+        # Render the plot lines, then the axes, labels, title and border
+        body = self._render_body(y_axis_width)
+        self.plot_width = save_width
+        renderable = self._decorate(body)
+        # Drawing bumps _data_version, so the key is taken once the frame
+        # is complete
+        self._render_cache = (self._frame_key(), renderable)
+        return renderable
+
+    def _frame_key(self) -> tuple:
+        """ Private method returning everything the rendered frame depends on.
+            The drawn data is tracked by _data_version, which the draw_*,
+            set_*_extents and add_* methods and clear() bump. """
+
+        return (self.width, self.height, self.plot_width, self.plot_height,
+                self.x_min, self.x_max, self.y_min, self.y_max,
+                self.border, self.border_style, self._data_version,
+                _axis_fields(self.x_axis), _axis_fields(self.y_axis))
+
+    def _y_axis_values(self) -> tuple(list(str), int):
+        """ Private method returning the Y axis tick labels and the widest one """
+
+        if self.y_axis is None:
+            return [], 0
+        self._y_axis_labels = _axis_labels(self.y_axis, self._y_axis_labels)
+        return self._y_axis_labels[1:]
+
+    def _render_body(self, y_axis_width: int) -> list(str):
+        """ Private method converting the canvas to lines of Braille / block
+            character markup, one per text row, with the annotations added """
+
+        # Pack each 4x2 block of canvas dots into a Braille pattern code and
+        # a block character code.  Canvas row 0 is the bottom of the plot,
+        # so the packed rows are flipped to run top to bottom.
+        plot_rows = max(self.plot_height, 0) // 4
+        plot_cols = max(self.plot_width, 0) // 2
+        c = self.canvas[:plot_rows*4, :plot_cols*2].reshape(plot_rows, 4, plot_cols, 2)
+        # The dots are 0/1, so each lands on its bit with a shift and OR.
+        braille = np.zeros((plot_rows, plot_cols), dtype=np.uint8)
+        for i, bits in enumerate(_BRAILLE_BITS):
+            for j, bit in enumerate(bits):
+                braille |= c[:,i,:,j] << bit
+        lower = c[:,0] | c[:,1]
+        upper = c[:,2] | c[:,3]
+        block_lower = (lower[...,0] << _BLOCK_LOWER_BITS[0]) | (lower[...,1] << _BLOCK_LOWER_BITS[1])
+        block_codes = (block_lower | (upper[...,0] << _BLOCK_UPPER_BITS[0])
+                       | (upper[...,1] << _BLOCK_UPPER_BITS[1]))
+
+        # Per-style lookup tables so the loop below only deals in style IDs
+        names = self._style_names
+        bolds = self._style_bolds
+        blocks = self._style_blocks
+        colors = self._style_colors
+        open_strs = self._style_opens
+        opens = self._style_open_bytes
+        tags = self._style_tags
+        block_glyphs = [ch.encode() for ch in self._block_char_list]
+        glyph_table = np.array(_BRAILLE_UTF8 + block_glyphs, dtype=object)
+
+        # Pick the block or Braille code and glyph of every cell from its
+        # style.  Block glyphs follow the 256 Braille ones in glyph_table.
+        palette = self.palette[:plot_rows, :plot_cols][::-1]
+        is_block = np.array(blocks)[palette]
+        codes = np.where(is_block, block_codes[::-1], braille[::-1])
+        glyphs = glyph_table.take(codes + is_block * 256).tolist()
+        block_lower = block_lower[::-1].tolist()
+
+        # Find the cells where the color changes, in one pass over the whole
+        # plot.  Only drawn cells with a style can change it, and the color
+        # carries over from one row to the next.
+        styled = (codes != 0) & (palette >= 0)
+        keys = np.array(colors)[palette[styled]]
+        changed = keys != np.concatenate(([-1], keys[:-1]))
+        change_rows, change_cols = np.nonzero(styled)
+        change_cols = change_cols[changed]
+        splits = np.cumsum(np.bincount(change_rows[changed], minlength=plot_rows))[:-1]
+        changes = [c.tolist() for c in np.split(change_cols, splits)]
+        has_dots = codes.any(axis=1).tolist()
+        palette = palette.tolist()
+        codes = codes.tolist()
+
+        # Convert the packed codes to and ASCII representation.  Each row is
+        # built as UTF-8 in a bytearray and decoded once, with the glyphs
+        # between color changes copied as one run.  For annotations,
+        # run_cols/run_pos record the column and string index at which each
+        # stretch of text between markup tags starts.
         text_lines = []
-        c = self.canvas
-        color = None
+        col_index = []
+        color = -1
         bold = False
-        once = True
-        for y in range(self.plot_height-4,-1,-4):
-            if color is not None:
-                text = f"[{color}]"
-            else:
-                text = ""
+        blank_row = " " * plot_cols + "\n"
+        for row in range(plot_rows):
+            if not has_dots[row]:
+                # Nothing drawn on this row, so it is all spaces
+                text_lines.append(open_strs[color] + blank_row)
+                col_index.append(([0], [len(open_strs[color])], plot_cols + 1))
+                continue
+            py = plot_rows - 1 - row
+            code_row = codes[row]
+            glyph_row = glyphs[row]
+            palette_row = palette[row]
+            line = bytearray(opens[color])
+            run_cols = [0]
+            run_pos = [len(line)]
             on_color = None
-            for x in range(0,self.plot_width,2):
-                pp = self.palette[int(y/4)][int(x/2)]
-                block = False
-                if pp is not None:
-                    block = pp.italic
-                    pp._attributes &= ~4
-                if block:
-                    p1 =  (c[y+0][x]   | c[y+1][x]) * 2
-                    p2 =  (c[y+2][x]   | c[y+3][x])
-                    p1 += (c[y+0][x+1] | c[y+1][x+1]) * 8
-                    p2 += (c[y+2][x+1] | c[y+3][x+1]) * 4
-                    p = p1 + p2
-                else:
-                    p =  c[y+0][x] * 64
-                    p += c[y+1][x] * 4
-                    p += c[y+2][x] * 2
-                    p += c[y+3][x] 
-                    p += c[y+0][x+1] * 128
-                    p += c[y+1][x+1] * 32
-                    p += c[y+2][x+1] * 16
-                    p += c[y+3][x+1] * 8
-        
-                if p == 0:
-                    text += ' '
-                else:
-                    if block:
-                        ch = self._block_char_list[p]
-                    else:
-                        ch = chr(10240 + p)
-                    if pp is not None:
-                        if color is None or pp.color != color.color:
-                            modifier = ""
-                            if pp.bold:
-                                modifier = "bold "
-                                bold = True
-                            elif bold:
-                                modifier = "not bold "
-                                bold = False
-                            else:
-                                modifier = ""
-                            if block and (p == 15):
-                                ch = self._block_char_list[p1]
-                                if once:
-                                    once = False
-                                if 0 and pp.color.type == ColorType.TRUECOLOR:
-                                    pb = self.block_palette[int(y/2)+1][int(x/2)].color
-                                    text += f"\u001b[38;2;{pp.color.triplet.red};{pp.color.triplet.green};{pp.color.triplet.blue}m"
-                                    text += f"\u001b[48;2;{pb.triplet.red};{pb.triplet.green};{pb.triplet.blue}m{ch}"
-                                else:
-                                    on_color = f'{self.block_palette[int(y/2)+1][int(x/2)].color.name}'
-                                    text += f"[{modifier}{pp.color.name}][on {on_color}]{ch}[/on {on_color}]"
-                                    #text += f"[{modifier}{pp.color.name}][on {on_color}]{ch}"
-                            else:
-                                text += f"[{modifier}{pp.color.name}]{ch}"
-                            color = pp
-                            block = color.italic
-                        else:
-                            text += ch
-                    else:
-                        text += ch
+            next_x = 0
+            for x in changes[row]:
+                # Glyphs up to x keep the current color
+                line += b"".join(glyph_row[next_x:x])
+                next_x = x + 1
+
+                pid = palette_row[x]
+                modifier = 0
+                if bolds[pid]:
+                    modifier = 1
+                    bold = True
+                elif bold:
+                    modifier = 2
+                    bold = False
+                pos = run_pos[-1] + x - run_cols[-1]
+                color = pid
+                if blocks[pid] and code_row[x] == 15:
+                    on_color = names[self.block_palette[py*2+1, x]]
+                    tag = tags[pid][modifier] + f"[on {on_color}]".encode()
+                    tag_end = f"[/on {on_color}]".encode()
+                    line += tag
+                    line += block_glyphs[block_lower[row][x]]
+                    line += tag_end
+                    run_cols += (x, x+1)
+                    run_pos += (pos + len(tag), pos + len(tag) + 1 + len(tag_end))
+                    continue
+                tag = tags[pid][modifier]
+                line += tag
+                line += glyph_row[x]
+                run_cols.append(x)
+                run_pos.append(pos + len(tag))
+            line += b"".join(glyph_row[next_x:])
             if on_color is not None:
-                text += f"[on black]"
-            text += "\n"
-            text_lines.append(text)
+                run_pos.append(run_pos[-1] + plot_cols - run_cols[-1] + 10)
+                run_cols.append(plot_cols)
+                line += b"[on black]"
+            line += b"\n"
+            text_lines.append(line.decode())
+            col_index.append((run_cols, run_pos, plot_cols + 1))
 
         # Render annotations
-        self.render_annotations(y_axis_width, text_lines)
+        self.render_annotations(y_axis_width, text_lines, col_index)
+        return text_lines
 
-        # Add Y axis
+    def _decorate(self, body: list(str)) -> RenderableType:
+        """ Private method adding the axes, labels, title and border to the plot
+            lines """
+
+        # Calculate Y axis size
+        y_vals, y_axis_width = self._y_axis_values()
+        axis_width = (self.plot_width >> 1) + 2
+        if self.y_axis is not None:
+            axis_width += 1
+        x_offset = y_axis_width
+        axis_width -= y_axis_width*2
+        row_prefixes = []
+
+        # Y axis
         if self.y_axis_style is not None:
             axis_color = f'[{self.x_axis_style.color.name}]'
         else:
             axis_color = '[white]'
         if self.y_axis is not None:
-            lines = [int(i * int(self.plot_height/4) / (self.y_axis.divisions-1)) for i in range(self.y_axis.divisions)]
-            index = 0
-            res = {lines[i] : y_vals[i] for i in range(len(y_vals))}
-            for l in text_lines:
-                if index in res:
-                    l = f"{axis_color}{res[index]:>{y_axis_width}}├" + l
-                else:
-                    l = f"{axis_color}{' ' * y_axis_width}│" + l
-                text_lines[index] = l
-                index += 1
-
-        # Add Y label
+            key = ('y_axis', _axis_fields(self.y_axis), self.y_axis_style, self.plot_height, len(body))
+            if key not in self._axis_cache:
+                lines = [i * (self.plot_height >> 2) // (self.y_axis.divisions-1) for i in range(self.y_axis.divisions)]
+                tick_by_row = [None] * len(body)
+                for line, val in zip(lines, y_vals):
+                    if line < len(tick_by_row):
+                        tick_by_row[line] = val
+                blank = f"{axis_color}{' ' * y_axis_width}│"
+                prefixes = [blank if t is None else f"{axis_color}{t:>{y_axis_width}}├" for t in tick_by_row]
+                self._set_axis_cache(key, prefixes)
+            row_prefixes.append(self._axis_cache[key])
+
+        # Y label, left of the Y axis
         if self.y_label is not None:
-            index = 0
             x_offset += 2
-            label_str = str(self.y_label).center(len(text_lines))
-            for l in text_lines:
-                if isinstance(self.y_label, Text):
-                    text_lines[index] = f"[not bold {self.y_label.style.color.name}]{label_str[index]} " + l
-                else:
-                    text_lines[index] = f"[not bold white]{label_str[index]} " + l
-                index += 1
+            key = ('y_label', _text_key(self.y_label), len(body))
+            if key not in self._axis_cache:
+                label_str = str(self.y_label).center(len(body))
+                prefixes = []
+                for index in range(len(body)):
+                    if isinstance(self.y_label, Text):
+                        prefixes.append(f"[not bold {self.y_label.style.color.name}]{label_str[index]} ")
+                    else:
+                        prefixes.append(f"[not bold white]{label_str[index]} ")
+                self._set_axis_cache(key, prefixes)
+            row_prefixes.insert(0, self._axis_cache[key])
+
+        # Prepend the Y label and axis to the plot lines in one pass
+        if row_prefixes:
+            text_lines = ["".join(parts) for parts in zip(*row_prefixes, body)]
+        else:
+            text_lines = list(body)
 
         # Add X axis
-        if self.x_axis is not None:
+        key = ('x_axis', _axis_fields(self.x_axis), self.x_axis_style, _axis_fields(self.y_axis), axis_width, x_offset)
+        if self.x_axis is not None and key in self._axis_cache:
+            text_lines.extend(self._axis_cache[key])
+        elif self.x_axis is not None:
             centers = [int(i * (axis_width-1) / (self.x_axis.divisions-1)) for i in range(self.x_axis.divisions)]
 
             if self.x_axis_style is not None:
                 axis_color = f'[not bold {self.x_axis_style.color.name}]'
             else:
                 axis_color = '[not bold white]'
-            axis_text = "└" + "─" * (axis_width-2) + "┘\n"
-            for i in range(len(centers)):
-                if i != 0 and i != len(centers)-1:
-                    axis_text = axis_text[:centers[i]] + '┴' + axis_text[centers[i]+1:]
+            # The axis lines are built as lists of characters, so ticks and
+            # labels are placed by slice assignment
+            axis_chars = list("└" + "─" * (axis_width-2) + "┘\n")
+            for center in centers[1:-1]:
+                axis_chars = _splice(axis_chars, center, '┴')
+            axis_text = ''.join(axis_chars)
             if self.y_axis:
                 axis_text = (" " * (x_offset-y_axis_width)) + f'{y_vals[-1]:>{y_axis_width}}' + axis_text
             else:
                 axis_text = (" " * x_offset) + axis_color + axis_text
             text_lines.append(axis_color + axis_text)
-            x_span = self.x_axis.max_value - self.x_axis.min_value
-            axis_text = ''
+            axis_chars = []
 
-            for i in range(self.x_axis.divisions):
-                ratio = i / float(self.x_axis.divisions-1)
-                axis_val = self.x_axis.min_value + ratio * x_span
-                axis_str = f'{axis_val:{self.x_axis.format_str}}'
+            self._x_axis_labels = _axis_labels(self.x_axis, self._x_axis_labels)
+            for i, axis_str in enumerate(self._x_axis_labels[1]):
                 axis_str_len = len(axis_str)
                 if i == 0:
-                    axis_text += axis_str
-                    axis_text += ' ' * (axis_width - axis_str_len-1)
+                    axis_chars.extend(axis_str)
+                    axis_chars.extend(' ' * (axis_width - axis_str_len-1))
                 elif i == self.x_axis.divisions - 1:
-                    pass
-                    axis_text = axis_text[:-axis_str_len] + ' ' + axis_str
-                    #axis_text +=  axis_str
+                    axis_chars[-axis_str_len:] = ' ' + axis_str
                 else:
-                    # Substitute text in the axis_text string
-                    pre_len = int(axis_str_len/2)
-                    rem = axis_str_len - pre_len
-                    axis_text = axis_text[:centers[i]-pre_len] + axis_str + axis_text[centers[i]-pre_len+axis_str_len:]
+                    # Substitute text centered on the tick
+                    axis_chars = _splice(axis_chars, centers[i] - (axis_str_len >> 1), axis_str)
 
-            axis_text += '\n'
+            axis_chars.append('\n')
+            axis_text = ''.join(axis_chars)
             text_lines.append((axis_color + " " * x_offset) + axis_text)
+            self._set_axis_cache(key, text_lines[-2:])
 
         # Add X label
         if self.x_label is not None:
-            if isinstance(self.x_label, Text):
-                text = f"[{self.x_label.style.color.name}]" + str(self.x_label).center(axis_width)
-            else:
-                text = "[white]" + self.x_label.center(axis_width)
-            text_lines.append(text)
-
-        self.plot_width = save_width
+            key = ('x_label', _text_key(self.x_label), axis_width)
+            if key not in self._axis_cache:
+                if isinstance(self.x_label, Text):
+                    text = f"[{self.x_label.style.color.name}]" + str(self.x_label).center(axis_width)
+                else:
+                    text = "[white]" + self.x_label.center(axis_width)
+                self._set_axis_cache(key, text)
+            text_lines.append(self._axis_cache[key])
 
         # Render the Title, if any
         if self.title is not None:
@@ -295,50 +618,118 @@ class TuiPlot(Widget):
         text += ''.join(text_lines)
 
         if self.border:
-            return Panel(
+            renderable = Panel(
                     text,
                     width=self.width,
                     height=self.height,
                     style=self.border_style,
             )
         else:
-            return text
+            renderable = text
+        return renderable
+
+    def _set_axis_cache(self, key: tuple, value) -> None:
+        """ Private method caching prebuilt axis or label strings under key.
+            key[0] names the kind of strings, and only the newest entry of
+            each kind is kept. """
+
+        for stale in [k for k in self._axis_cache if k[0] == key[0]]:
+            del self._axis_cache[stale]
+        self._axis_cache[key] = value
 
     def set_x_extents(self, x_min, x_max) -> None:
         """ Sets the virtual X extents for drawing """
 
         self.x_min = x_min
         self.x_max = x_max
+        self._data_version += 1
 
     def set_y_extents(self, y_min, y_max) -> None:
         """ Sets the virtual Y extents for drawing """
 
         self.y_min = y_min
         self.y_max = y_max
+        self._data_version += 1
 
     def set_height(self, height: int) -> None:
         """ Sets the plot window height in rows """
 
         self.height = height
-        self.plot_height = (height -1) * 4
-        if self.border:
-            self.plot_height -= 4
-        if self.x_label is not None:
-            self.plot_height -= 4
-        if self.x_axis is not None:
-            self.plot_height -= 4
-        if self.title is not None:
-            self.plot_height -= 4
+        self._update_geometry()
+        if self.width is not None:
+            self._alloc_canvas()
 
     def set_width(self, width: int) -> None:
         """ Sets the plot window width in columns """
 
         self.width = width
-        self.plot_width = (width - 6) * 2
-        if self.border:
-            self.plot_width -= 8
-        if self.y_label is not None:
-            self.plot_width -= 4
+        self._update_geometry()
+        if self.height is not None:
+            self._alloc_canvas()
+
+    def _update_geometry(self) -> None:
+        """ Private method to recompute the drawing area from the window size,
+            border, title, labels and axes.  Called whenever any of them change. """
+
+        if self.height is not None:
+            plot_height = (self.height -1) * 4
+            if self.border:
+                plot_height -= 4
+            if self.x_label is not None:
+                plot_height -= 4
+            if self.x_axis is not None:
+                plot_height -= 4
+            if self.title is not None:
+                plot_height -= 4
+            self._plot_height = plot_height
+        if self.width is not None:
+            plot_width = (self.width - 6) * 2
+            if self.border:
+                plot_width -= 8
+            if self.y_label is not None:
+                plot_width -= 4
+            self._plot_width = plot_width
+        self._axis_cache.clear()
+        self._data_version += 1
+
+    @property
+    def plot_width(self) -> int:
+        """ Width of the drawing area in canvas dots """
+        return self._plot_width
+
+    @plot_width.setter
+    def plot_width(self, plot_width: int) -> None:
+        self._plot_width = plot_width
+
+    @property
+    def plot_height(self) -> int:
+        """ Height of the drawing area in canvas dots """
+        return self._plot_height
+
+    @plot_height.setter
+    def plot_height(self, plot_height: int) -> None:
+        self._plot_height = plot_height
+
+    def _scales(self) -> tuple(float, float, PlotExtents):
+        """ Private method returning the x and y scale from virtual to canvas
+            coordinates and the canvas extents, cached until the drawing area
+            or the virtual extents change """
+
+        key = (self._plot_width, self._plot_height, self.x_min, self.x_max, self.y_min, self.y_max)
+        if self._scale_cache is None or self._scale_cache[0] != key:
+            xscale = self._plot_width / (self.x_max - self.x_min)
+            yscale = self._plot_height / (self.y_max - self.y_min)
+            extents = PlotExtents(int(self.x_min * xscale), int(self.x_max * xscale),
+                    int(self.y_min * yscale), int(self.y_max * yscale))
+            self._scale_cache = (key, xscale, yscale, extents)
+        return self._scale_cache[1:]
+
+    def _alloc_canvas(self) -> None:
+        """ Private method to allocate the canvas and palettes for the current size """
+
+        self.canvas = np.zeros((self.height*4, self.width*2), dtype=np.uint8)
+        self.palette = np.full((self.height, self.width), -1, dtype=np.int32)
+        self.block_palette = np.full((self.height*2, self.width), -1, dtype=np.int32)
 
     def draw_line(self,
             x1: float,
@@ -349,18 +740,13 @@ class TuiPlot(Widget):
         ) -> None:
         """ Renders a line to the canvas using the current style """
 
+        self._data_version += 1
         if color is not None:
             self.push_line_color(color)
 
         # Account for frame and padding
-        xscale = self.plot_width / (self.x_max - self.x_min)
-        yscale = self.plot_height / (self.y_max - self.y_min)
-
-        x_min = int(self.x_min * xscale)
-        x_max = int(self.x_max * xscale)
-        y_min = int(self.y_min * yscale)
-        y_max = int(self.y_max * yscale)
-        extents = PlotExtents(x_min, x_max, y_min, y_max)
+        xscale, yscale, extents = self._scales()
+        x_min, x_max, y_min, y_max = extents
 
         xl = int(x1 * xscale)
         xr = int(x2 * xscale)
@@ -377,49 +763,101 @@ class TuiPlot(Widget):
             xr,xl = xl,xr
             yr,yl = yl,yr
 
-        # Start at left endpoint
-        x = xl
-        y = yl
-
         # Delta X and Y
         dx = xr - xl
-        dy = yr - yl
-
-        # Test for vertical line
-        if dx == 0:
-            if dy == 0:
-                # Single plot point
-                if steep:
-                    self._putpixel(y, x, extents)
-                else:
-                    self._putpixel(x, y, extents)
-                return
-
-            if yr < yl:
-                yr,yl = yl,yr
-            for y in range(yl, yr+1):
-                # Single vertical line
-                if steep:
-                    self._putpixel(y, x, extents)
-                else:
-                    self._putpixel(x, y, extents)
-                return
-            
-        # Error terms
-        derror = abs(dy/dx)
-        err = 0
-
-        while x <= xr:
+        dy = abs(yr - yl)
+        y_step = 1 if yr > yl else -1
+
+        # Clip to the steps that land inside the plot, so no dot needs a
+        # bounds check
+        steps = _clip_line_steps(xl, yl, xr, yr, steep, x_min, x_max, y_max-y_min)
+        if steps is None:
+            pass
+        elif have_numba:
+            conceal = self.style is not None and self.style.conceal
+            _bresenham_numba(self.canvas, self.palette, self.block_palette,
+                    xl, yl, dx, dy, y_step, steps[0], steps[1], steep,
+                    0 if conceal else 1, -1 if conceal else self._style_id(),
+                    self.block_chars > 0)
+        else:
+            # Rasterize every dot along the major axis at once.  The minor axis
+            # offset at step k is the integer form of the Bresenham error term,
+            # round-half-down of k*dy/dx.  Vertical lines and single points
+            # (dx == 0) fall out of the same expression.
+            k = np.arange(steps[0], steps[1]+1)
+            x = xl + k
+            y = yl + y_step * ((2*dy*k + max(dx-1, 0)) // max(2*dx, 1))
             if steep:
-                self._putpixel(y, x, extents)
+                self._setpixels(y, x)
             else:
-                self._putpixel(x, y, extents)
+                self._setpixels(x, y)
+
+        if color is not None:
+            self.pop_line_color()
 
-            err += derror
-            if err > 0.5:
-                y += (1 if yr > yl else -1)
-                err -= 1
-            x += 1
+    def draw_lines(self,
+            x: list(float) | np.ndarray,
+            y: list(float) | np.ndarray,
+            color: str | Style | None = None,
+        ) -> None:
+        """ Renders a connected line through the points (x[i], y[i]) using the
+            current style.  Draws the same dots as calling draw_line for each
+            segment, but rasterizes all segments in one NumPy pass. """
+
+        self._data_version += 1
+        if color is not None:
+            self.push_line_color(color)
+
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) > 1:
+            # Account for frame and padding
+            xscale, yscale, extents = self._scales()
+            x_min, x_max, y_min, y_max = extents
+            y_span = y_max - y_min
+            px = np.trunc(x * xscale).astype(np.int64)
+            py = np.trunc(y * yscale).astype(np.int64) - y_min
+
+            # Each segment in major/minor axis terms, left to right, as in
+            # draw_line
+            xl, yl, xr, yr = px[:-1], py[:-1], px[1:], py[1:]
+            steep = np.abs(xl-xr) < np.abs(yl-yr)
+            xl, yl = np.where(steep, yl, xl), np.where(steep, xl, yl)
+            xr, yr = np.where(steep, yr, xr), np.where(steep, xr, yr)
+            swap = xr < xl
+            xl, xr = np.where(swap, xr, xl), np.where(swap, xl, xr)
+            yl, yr = np.where(swap, yr, yl), np.where(swap, yl, yr)
+            dx = xr - xl
+            dy = np.abs(yr - yl)
+            rising = yr > yl
+            y_step = np.where(rising, 1, -1)
+
+            # Clip every segment to the steps that land inside the plot, the
+            # same arithmetic as _clip_line_steps
+            major_lo = np.where(steep, 0, x_min)
+            major_hi = np.where(steep, y_span, x_max)
+            minor_lo = np.where(steep, x_min, 0)
+            minor_hi = np.where(steep, x_max, y_span)
+            k0 = np.maximum(0, major_lo - xl)
+            k1 = np.minimum(dx, major_hi - 1 - xl)
+            c = np.maximum(dx-1, 0)
+            d = np.maximum(2*dx, 1)
+            lo = np.where(rising, minor_lo - yl, yl - minor_hi + 1)
+            hi = np.where(rising, minor_hi - 1 - yl, yl - minor_lo)
+            two_dy = np.maximum(2*dy, 1)
+            flat = dy == 0
+            k0 = np.where(flat, np.where((lo > 0) | (hi < 0), k1 + 1, k0),
+                    np.maximum(k0, -((c - lo*d) // two_dy)))
+            k1 = np.where(flat, k1, np.minimum(k1, -((c - (hi+1)*d) // two_dy) - 1))
+            n = np.maximum(k1 - k0 + 1, 0)
+
+            # Steps of all segments back to back, then their dots
+            seg = np.repeat(np.arange(len(n)), n)
+            k = k0[seg] + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+            major = xl[seg] + k
+            minor = yl[seg] + y_step[seg] * ((2*dy[seg]*k + c[seg]) // d[seg])
+            seg_steep = steep[seg]
+            self._setpixels(np.where(seg_steep, minor, major), np.where(seg_steep, major, minor))
 
         if color is not None:
             self.pop_line_color()
@@ -431,7 +869,8 @@ class TuiPlot(Widget):
         if isinstance(color, Style):
             self.style = color
         else:
-            self.style = Style(color = color)
+            self.style = _color_style(color)
+        self._style_id()
 
     def pop_line_color(self) -> None:
         """ Pop the current line color / style from the style stack. """
@@ -455,37 +894,78 @@ class TuiPlot(Widget):
         """ Draws the data to the bare canvas """
         pass
 
+    def clear(self) -> None:
+        """ Marks the drawn data as changed, so the next render calls
+            render_canvas() again instead of reusing the last frame """
+        self._data_version += 1
+
     def add_x_label(self, label: str | Text) -> None:
         """ Add an X label to the graph """
         self.x_label = label
+        self._update_geometry()
 
     def add_y_label(self, label: str | Text) -> None:
         """ Add a Y label to the graph """
         self.y_label = label
+        self._update_geometry()
 
     def add_title(self, title: str | Text) -> None:
         """ Add a Y label to the graph """
         self.title = title
+        self._update_geometry()
 
     def add_x_axis(self, axis: PlotAxis, style: StyleType | None = None) -> None:
         """ Add an X axis to the graph """
         self.x_axis = axis
         self.x_axis_style = style
+        self._update_geometry()
 
     def add_y_axis(self, axis: PlotAxis, style: StyleType | None = None) -> None:
         """ Add an Y axis to the graph """
         self.y_axis = axis
         self.y_axis_style = style
+        self._update_geometry()
 
     def add_annotation(self, x: float, y: float, text: Text) -> None:
-        """ Add a Text annotation at the given coordinate """
-
-        self.annotations.append(PlotAnnotation(x, y, text))
-
-    def render_annotations(self, y_axis_width: int, text_lines: list(str)) -> None:
-        """ Renders text annotations to the list of strings rendered from the canvas """
-
-        if len(self.annotations) == 0:
+        """ Add a Text annotation at the given coordinate.  Where annotations
+            on the same line overlap, the one further right is drawn on top. """
+
+        n = self._ann_count
+        if n == len(self._ann_x):
+            grow = max(4, n)
+            self._ann_x = np.concatenate((self._ann_x, np.empty(grow)))
+            self._ann_y = np.concatenate((self._ann_y, np.empty(grow)))
+        self._ann_x[n] = x
+        self._ann_y[n] = y
+        self._ann_text.append(text)
+        self._ann_count = n + 1
+        self._data_version += 1
+
+    @property
+    def annotations(self) -> tuple(PlotAnnotation):
+        """ The annotations added so far, as PlotAnnotation records.  This is
+            a read-only snapshot; use add_annotation() or assign a new list
+            to change them. """
+        return tuple(PlotAnnotation(float(self._ann_x[i]), float(self._ann_y[i]), self._ann_text[i])
+                for i in range(self._ann_count))
+
+    @annotations.setter
+    def annotations(self, annotations: list(PlotAnnotation)) -> None:
+        self._ann_x = np.array([a.x for a in annotations], dtype=np.float64)
+        self._ann_y = np.array([a.y for a in annotations], dtype=np.float64)
+        self._ann_text = [a.text for a in annotations]
+        self._ann_count = len(annotations)
+        self._data_version += 1
+
+    def render_annotations(self, y_axis_width: int, text_lines: list(str), col_index: list(list(int))) -> None:
+        """ Renders text annotations to the list of strings rendered from the canvas.
+            col_index holds, for each line, the (columns, string indexes) at which
+            its runs of text between markup tags start, and its column count
+            including the trailing newline.
+        """
+
+        n = self._ann_count
+        if n == 0:
             return
         
         # Account for frame and padding
@@ -497,98 +977,167 @@ class TuiPlot(Widget):
         y_min = int(self.y_min * yscale)
         y_max = int(self.y_max * yscale)
 
-        # Loop for all annotations
-        for a in self.annotations:
-            x = int(a.x * xscale / 2)
-            y = len(text_lines) - int((a.y * yscale - y_min) / 4) - 1
-
-            restore_color = ''
-            an_text = str(a.text)
-
-            # Find the 'x' location within the 'y' string
-            if y>= 0 and y < len(text_lines) and x >= x_min and x < x_max:
-                text_len = 0
-                s = text_lines[y]
-                in_attr = False
-                for idx in range(len(s)):
-                    if s[idx] == '[':
-                        in_attr = True
-                        restore_color = ''
-                    elif in_attr:
-                        if s[idx] == ']':
-                            in_attr = False
-                        else:
-                            restore_color += s[idx]
+        # Place all annotations at once, then bucket those inside the plot
+        # by line
+        xs = (self._ann_x[:n] * xscale / 2).astype(np.int64)
+        ys = len(text_lines) - ((self._ann_y[:n] * yscale - y_min) / 4).astype(np.int64) - 1
+        inside = (ys >= 0) & (ys < len(text_lines)) & (xs >= x_min) & (xs < x_max)
+        xs = xs.tolist()
+        ys = ys.tolist()
+        buckets = {}
+        for i in np.flatnonzero(inside).tolist():
+            x = xs[i]
+            y = ys[i]
+            # Columns off the end of the line insert at the newline
+            ncols = col_index[y][2]
+            if not 0 <= x < ncols:
+                x = ncols - 1
+            buckets.setdefault(y, []).append((x, i, self._ann_text[i]))
+
+        # Insert each line's annotations from right to left, so the column
+        # index stays valid for everything left of the last insertion.  Where
+        # annotations overlap, the one further right wins.
+        for y, anns in buckets.items():
+            s = text_lines[y]
+            run_cols, run_pos, ncols = col_index[y]
+            limit = None
+            for x, _, text in sorted(anns, reverse=True):
+                restore_color = ''
+                an_text = str(text)
+                text_len = len(an_text)
+                if limit is not None and x + text_len > limit:
+                    text_len = limit - x
+                    if text_len <= 0:
+                        continue
+                    an_text = an_text[:text_len]
+                i = bisect_right(run_cols, x) - 1
+                idx = run_pos[i] + x - run_cols[i]
+
+                # The color to restore is the last [color] modifier before idx
+                tag_start = s.rfind('[', 0, idx)
+                if tag_start >= 0:
+                    restore_color = s[tag_start+1:s.index(']', tag_start)]
+
+                # Strip out text_len columns after this; any [color] modifiers
+                # in between are dropped along with them
+                end = x + text_len
+                if end <= ncols:
+                    if text_len > 0:
+                        i = bisect_right(run_cols, end-1) - 1
+                        loc = run_pos[i] + end-1 - run_cols[i] + 1
                     else:
-                        # Test if we found the insertion point
-                        if text_len == x:
-                            break
-                        text_len += 1
-
-                # Strip out len(a.text) characters after this, taking into account
-                # that the string might contain [color] modifiers
-                rem = len(a.text)
-                loc = idx
-                in_attr = False
-                end_text = s[idx:]
-                repl = ''
-                try:
-                    while rem > 0:
-                        if s[loc] == '[':
-                            in_attr = True
-                        elif s[loc] == ']':
-                            in_attr = False
-                        elif not in_attr:
-                            repl += s[loc]
-                            rem -= 1
-                        loc += 1
+                        loc = idx
                     post = s[loc:]
-                except IndexError:
+                else:
+                    rem = end - ncols
                     post = '\n'
                     an_text = an_text[:-rem-3]
 
-                # Insert the text at 'idx' within the string
-                if isinstance(a.text, Text):
-                    text_lines[y] = s[:idx] + f"[not bold {a.text.style.color.name}]" + an_text + f"[{restore_color}]" + post
+                # Insert the text at 'idx' within the string.  With no color
+                # before it, just close the annotation's own tag.
+                if isinstance(text, Text):
+                    restore_tag = f"[{restore_color}]" if restore_color else "[/]"
+                    s = "".join((s[:idx], f"[not bold {text.style.color.name}]", an_text, restore_tag, post))
                 else:
-                    text_lines[y] = s[:idx] + f"[not bold white]" + an_text + post
+                    s = "".join((s[:idx], "[not bold white]", an_text, post))
+                limit = x
+            text_lines[y] = s
 
     def _putpixel(self, x: int, y: int, ext: PlotExtents) -> None:
         """ Private method to set/clear a single pixel in the canvas """
 
-        px = int(x/2)
-        py = int(y/4)
-
-        if x >= ext.xmin and x < ext.xmax and y >= (ext.ymin-ext.ymin) and y < (ext.ymax-ext.ymin):
+        if ext.xmin <= x < ext.xmax and 0 <= y < ext.ymax - ext.ymin:
             if self.style is not None and self.style.conceal:
-                self.canvas[y][x] = 0
+                self.canvas[y, x] = 0
             else:
-                self.canvas[y][x] = 1
+                self.canvas[y, x] = 1
+                style_id = self._style_id()
+                if style_id >= 0:
+                    self.palette[y >> 2, x >> 1] = style_id
+                    if self.block_chars > 0:
+                        self.block_palette[y >> 1, x >> 1] = style_id
+
+    def _style_id(self) -> int:
+        """ Private method returning the palette style ID of the current
+            style (-1 for no style), adding it to the style table if needed """
+
+        block = self.block_chars > 0
+        if self.style is self._last_style and block == self._last_block:
+            return self._last_style_id
+
+        if not self.style:
+            style_id = -1
+        else:
+            # Block character cells are marked by an italic style
+            style = self.style+Style(italic=True) if block else self.style
+            style_id = self._style_index.get(style)
+            if style_id is None:
+                style_id = self._add_style(style)
+
+        self._last_style = self.style
+        self._last_block = block
+        self._last_style_id = style_id
+        return style_id
+
+    def _add_style(self, style: Style) -> int:
+        """ Private method adding a style to the style table along with its
+            render attributes, returning the new style ID """
+
+        style_id = len(self._style_table)
+        self._style_table.append(style)
+        self._style_index[style] = style_id
+
+        # Block styles carry the italic flag only to mark the cell
+        name = style.color.name if style.color else None
+        open_tag = f"[{style + Style(italic=False)}]" if style.italic else f"[{style}]"
+        color = self._color_keys.setdefault(style.color, len(self._color_keys))
+        for table, value in ((self._style_names, name),
+                             (self._style_bolds, bool(style.bold)),
+                             (self._style_blocks, bool(style.italic)),
+                             (self._style_colors, color),
+                             (self._style_opens, open_tag),
+                             (self._style_open_bytes, open_tag.encode()),
+                             (self._style_tags, (f"[{name}]".encode(), f"[bold {name}]".encode(),
+                                                 f"[not bold {name}]".encode()))):
+            table.insert(style_id, value)
+        return style_id
+
+    def _putpixels(self, x: np.ndarray, y: np.ndarray, ext: PlotExtents) -> None:
+        """ Private method to set/clear an array of pixels in the canvas """
+
+        valid = (x >= ext.xmin) & (x < ext.xmax) & (y >= 0) & (y < (ext.ymax-ext.ymin))
+        self._setpixels(x[valid], y[valid])
+
+    def _setpixels(self, x: np.ndarray, y: np.ndarray) -> None:
+        """ Private method to set/clear an array of pixels already within the plot """
+
+        if self.style is not None and self.style.conceal:
+            self.canvas[y, x] = 0
+        else:
+            self.canvas[y, x] = 1
+            style_id = self._style_id()
+            if style_id >= 0:
+                self.palette[y >> 2, x >> 1] = style_id
                 if self.block_chars > 0:
-                    self.palette[py][px] = self.style+Style(italic=True) or self.palette[py][px]
-                    self.block_palette[int(y/2)][px] = self.style+Style(italic=True) or self.block_palette[int(y/2)][px]
-                else:
-                    self.palette[py][px] = self.style or self.palette[py][px]
+                    self.block_palette[y >> 1, x >> 1] = style_id
+
+    def _putspan(self, x1: int, x2: int, y: int, ext: PlotExtents) -> None:
+        """ Private method to set/clear pixels x1..x2 of one canvas row with
+            slice writes, clipped to the plot """
+
+        conceal = self.style is not None and self.style.conceal
+        _fill_numba(self.canvas, self.palette, self.block_palette, x1, x2, y, y,
+                ext.xmin, ext.xmax, ext.ymax-ext.ymin, 0 if conceal else 1,
+                -1 if conceal else self._style_id(), self.block_chars > 0)
 
     def _draw_circle_dots(self, xc: int, yc: int, x: int, y: int, ext: PlotExtents, filled: bool = False) -> None:
         """ Private routine used by the draw_circle method to draw portions of the circle """
 
         if filled:
-            x1 = xc-x
-            x2 = xc+x
-            if x1 > x2:
-                x1,x2 = x2, x1
-            for i in range(x1, x2+1):
-                self._putpixel(i, yc+y, ext)
-                self._putpixel(i, yc-y, ext)
-
-            x1 = xc-y
-            x2 = xc+y
-            if x1 > x2:
-                x1,x2 = x2, x1
-            for i in range(x1, x2+1):
-                self._putpixel(i, yc+x, ext)
-                self._putpixel(i, yc-x, ext)
+            self._putspan(xc-x, xc+x, yc+y, ext)
+            self._putspan(xc-x, xc+x, yc-y, ext)
+            self._putspan(xc-y, xc+y, yc+x, ext)
+            self._putspan(xc-y, xc+y, yc-x, ext)
         else:
             self._putpixel(xc+x, yc+y, ext)
             self._putpixel(xc-x, yc+y, ext)
@@ -608,34 +1157,36 @@ class TuiPlot(Widget):
         ) -> None:
         """ Renders a circle to the canvas using the current style """
 
+        self._data_version += 1
         if color is not None:
             self.push_line_color(color)
 
         # Account for frame and padding
-        xscale = self.plot_width / (self.x_max - self.x_min)
-        yscale = self.plot_height / (self.y_max - self.y_min)
-
-        x_min = int(self.x_min * xscale)
-        x_max = int(self.x_max * xscale)
-        y_min = int(self.y_min * yscale)
-        y_max = int(self.y_max * yscale)
-        extents = PlotExtents(x_min, x_max, y_min, y_max)
+        xscale, yscale, extents = self._scales()
+        x_min, x_max, y_min, y_max = extents
 
         xc = int(x * xscale)
         yc = int(y * yscale) - y_min
 
-        x = 0
-        y = radius
-        d = 3 - 2 * radius
-        self._draw_circle_dots(xc, yc, x, y, extents, filled)
-        while y >= x:
-            x += 1
-            if d > 0:
-                y -= 1
-                d += 4 * (x - y) + 10
-            else:
-                d += 4 * x + 6
+        if have_numba:
+            conceal = self.style is not None and self.style.conceal
+            _circle_numba(self.canvas, self.palette, self.block_palette,
+                    xc, yc, radius, filled, x_min, x_max, y_max-y_min,
+                    0 if conceal else 1, -1 if conceal else self._style_id(),
+                    self.block_chars > 0)
+        else:
+            x = 0
+            y = radius
+            d = 3 - 2 * radius
             self._draw_circle_dots(xc, yc, x, y, extents, filled)
+            while y >= x:
+                x += 1
+                if d > 0:
+                    y -= 1
+                    d += 4 * (x - y) + 10
+                else:
+                    d += 4 * x + 6
+                self._draw_circle_dots(xc, yc, x, y, extents, filled)
 
         if color is not None:
             self.pop_line_color()
@@ -650,34 +1201,25 @@ class TuiPlot(Widget):
         ) -> None:
         """ Renders a rectangle to the canvas using the current style """
 
+        self._data_version += 1
         if color is not None:
             self.push_line_color(color)
 
         # For filled rectangle, we draw multiple horizontal lines
         if filled:
             # Account for frame and padding
-            xscale = self.plot_width / (self.x_max - self.x_min)
-            yscale = self.plot_height / (self.y_max - self.y_min)
-
-            x_min = int(self.x_min * xscale)
-            x_max = int(self.x_max * xscale)
-            y_min = int(self.y_min * yscale)
-            y_max = int(self.y_max * yscale)
-            extents = PlotExtents(x_min, x_max, y_min, y_max)
+            xscale, yscale, extents = self._scales()
+            x_min, x_max, y_min, y_max = extents
 
             x1 = int(x1 * xscale)
             x2 = x1 + int(w * xscale)
             y1 = int(y1 * yscale) - y_min
             y2 = y1 + int(h * yscale)
 
-            if x1 > x2:
-                x1,x2 = x2,x1
-            ydelta = 1
-            if y1 > y2:
-                ydelta = -1
-            for x in range(x1, x2+1):
-                for y in range(y1, y2+ydelta, ydelta):
-                    self._putpixel(x, y, extents)
+            conceal = self.style is not None and self.style.conceal
+            _fill_numba(self.canvas, self.palette, self.block_palette, x1, x2, y1, y2,
+                    x_min, x_max, y_max-y_min, 0 if conceal else 1,
+                    -1 if conceal else self._style_id(), self.block_chars > 0)
         else:
             # We just need to draw the 4 outline lines
             self.draw_line(x1, y1, x1+w, y1)
@@ -691,38 +1233,39 @@ class TuiPlot(Widget):
     def draw_pbm(self, x: float, y: float, filename: str) -> None:
         """ Render an PBM image from filename to x,y """
 
+        self._data_version += 1
         if not have_pil:
             self.draw_circle(x+20, y+20, 3)
             return
 
         img = Image.open(filename)
-        px = img.load()
-        
-        # Account for frame and padding
-        xscale = self.plot_width / (self.x_max - self.x_min)
-        yscale = self.plot_height / (self.y_max - self.y_min)
 
-        x_min = int(self.x_min * xscale)
-        x_max = int(self.x_max * xscale)
-        y_min = int(self.y_min * yscale)
-        y_max = int(self.y_max * yscale)
-        extents = PlotExtents(x_min, x_max, y_min, y_max)
+        # Account for frame and padding
+        xscale, yscale, extents = self._scales()
+        x_min, x_max, y_min, y_max = extents
 
         xp = int(x * xscale)
         yp = int(y * yscale) - y_min
 
-        for y1 in range(img.height):
-            for x1 in range(img.width):
-                if isinstance(px[x1,y1], tuple):
-                    if px[x1,y1] != (0, 0, 0):
-                        self._putpixel(int(x1*xscale), int(y1*yscale)-y_min, extents)
-                else:
-                    if px[x1,y1]:
-                        self._putpixel(int(x1*xscale), int(y1*yscale)-y_min, extents)
+        # Find the lit pixels.  RGB pixels are lit unless black, and other
+        # multi-band pixels always are.
+        pixels = np.asarray(img)
+        if pixels.ndim == 3:
+            lit = pixels.any(axis=2) if pixels.shape[2] == 3 else np.ones(pixels.shape[:2], dtype=bool)
+        else:
+            lit = pixels != 0
+
+        # Map image columns and rows to canvas dots once, and bounds test all
+        # lit pixels together
+        rows, cols = np.nonzero(lit)
+        canvas_x = (np.arange(img.width) * xscale).astype(np.int64)
+        canvas_y = (np.arange(img.height) * yscale).astype(np.int64) - y_min
+        self._putpixels(canvas_x[cols], canvas_y[rows], extents)
 
     def draw_image(self, x: float, y: float, filename: str) -> None:
         """ Render an PBM image from filename to x,y """
 
+        self._data_version += 1
         if not have_pil:
             self.draw_circle(x+20, y+20, 3)
             return
@@ -731,14 +1274,8 @@ class TuiPlot(Widget):
 #        rgb_img = img.convert('RGB')
         
         # Account for frame and padding
-        xscale = self.plot_width / (self.x_max - self.x_min)
-        yscale = self.plot_height / (self.y_max - self.y_min)
-
-        x_min = int(self.x_min * xscale)
-        x_max = int(self.x_max * xscale)
-        y_min = int(self.y_min * yscale)
-        y_max = int(self.y_max * yscale)
-        extents = PlotExtents(x_min, x_max, y_min, y_max)
+        xscale, yscale, extents = self._scales()
+        x_min, x_max, y_min, y_max = extents
 
         xp = int(x * xscale)
         yp = int(y * yscale) - y_min
@@ -783,8 +1320,8 @@ class TuiPlot(Widget):
         rgb_img = img.convert('RGB')
         region = self._parent.child_region
 
-        y = region.y + int(self.image_yp/4)
-        x = region.x + int(self.image_xp/2)
+        y = region.y + (self.image_yp >> 2)
+        x = region.x + (self.image_xp >> 1)
 
         scale = 1.0
         height = region.height